@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+"""
+microbenchmarks for the framework. run them from the repository root with::
+
+    python -m benchmarks                              # run everything
+    python -m benchmarks view message                 # only run benchmarks whose name starts with view or message
+    python -m benchmarks --save baseline.json         # store the results as a baseline
+    python -m benchmarks --compare baseline.json      # flag anything slower than the baseline by more than 10%
+
+baselines are only meaningful on the machine and interpreter they were recorded with.
+
+``python -m benchmarks.stress`` runs threads dispatching events against the tick loop, and fails if any event is
+lost, duplicated or reordered.
+"""
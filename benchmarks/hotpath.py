@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+"""
+benchmarks for the command hot path: everything that runs between Execute receiving a chat message
+and the command callback being called.
+"""
+import time
+
+import extension as ext
+from extension.headless import HeadlessData, HeadlessParent, HeadlessRuntime
+from extension.abc import Object, Platforms
+from extension.view import StringView
+from extension.message import Message
+from extension.cooldowns import CooldownMapping, BucketType
+
+from .runner import benchmark
+
+_content = '!give someone 100 "a quoted reason" and the rest of it'
+
+
+def _make_bot(commands=50):
+    bot = ext.Bot(prefix="!")
+    for index in range(commands):
+        bot.command(name="command{0}".format(index))(lambda msg: None)
+
+    @bot.command()
+    def give(msg, user=str, amount=int, rest=ext.RestOfInput):
+        pass
+
+    @bot.group()
+    def shop(msg):
+        pass
+
+    @shop.command()
+    def buy(msg, item=str, amount=int):
+        pass
+
+    parent = HeadlessParent()
+    parent.viewers = ["someone"]
+    HeadlessRuntime(bot, parent).init()
+    return bot
+
+
+def _message(bot, content):
+    data = HeadlessData("benchmark", content)
+    return Message(bot, data.User, data.UserName, content, bot.get_channel(Platforms.twitch), data)
+
+
+# StringView
+
+@benchmark("view.get_word")
+def view_get_word():
+    def func():
+        view = StringView(_content)
+        while not view.eof:
+            view.skip_ws()
+            view.get_word()
+    return func
+
+
+@benchmark("view.get_quoted_word")
+def view_get_quoted_word():
+    def func():
+        view = StringView(_content)
+        while not view.eof:
+            view.skip_ws()
+            view.get_quoted_word()
+    return func
+
+
+# prefix and message
+
+@benchmark("bot.get_prefix")
+def bot_get_prefix():
+    bot = _make_bot()
+    msg = _message(bot, _content)
+    return lambda: bot.get_prefix(msg)
+
+
+@benchmark("message.construct.plain")
+def message_plain():
+    bot = _make_bot()
+    return lambda: _message(bot, "just some chat, nothing to see here")
+
+
+@benchmark("message.construct.command")
+def message_command():
+    bot = _make_bot()
+    return lambda: _message(bot, _content)
+
+
+# command routing
+
+def _routing(commands, content):
+    bot = _make_bot(commands)
+    msg = _message(bot, content)
+
+    def func():
+        msg.view = StringView(content)
+        msg._find_for_dispatch()
+    return func
+
+
+@benchmark("routing.command.10")
+def routing_10():
+    return _routing(10, "!command5 hello")
+
+
+@benchmark("routing.command.500")
+def routing_500():
+    return _routing(500, "!command250 hello")
+
+
+@benchmark("routing.group")
+def routing_group():
+    return _routing(50, "!shop buy sword 2")
+
+
+@benchmark("routing.miss")
+def routing_miss():
+    return _routing(50, "!nothing here")
+
+
+# parameter conversion
+
+def _parameters(converter, argument):
+    bot = _make_bot(0)
+
+    @bot.command()
+    def convert(msg, value=converter):
+        pass
+
+    content = "!convert " + argument
+    msg = _message(bot, content)
+
+    def func():
+        msg.view.index = msg.view.previous = 0
+        convert.do_parameters(msg, True)
+    return func
+
+
+@benchmark("do_parameters.str")
+def parameters_str():
+    return _parameters(str, "hello")
+
+
+@benchmark("do_parameters.quoted_str")
+def parameters_quoted():
+    return _parameters(str, '"hello there"')
+
+
+@benchmark("do_parameters.int")
+def parameters_int():
+    return _parameters(int, "100")
+
+
+@benchmark("do_parameters.float")
+def parameters_float():
+    return _parameters(float, "1.5")
+
+
+@benchmark("do_parameters.bool")
+def parameters_bool():
+    return _parameters(bool, "yes")
+
+
+@benchmark("do_parameters.user")
+def parameters_user():
+    return _parameters(ext.User, "someone")
+
+
+@benchmark("do_parameters.optional")
+def parameters_optional():
+    return _parameters(ext.Optional[int], "nope")
+
+
+@benchmark("do_parameters.union")
+def parameters_union():
+    return _parameters(ext.Union[int, str], "hello")
+
+
+@benchmark("do_parameters.rest")
+def parameters_rest():
+    return _parameters(ext.RestOfInput, "all of the rest of the message")
+
+
+# cooldowns
+
+def _bucket(size):
+    mapping = CooldownMapping.from_cooldown(1, 60, BucketType.user)
+    now = time.time()
+    for index in range(size):
+        mapping.update_rate_limit(Object(author=Object(id="user{0}".format(index))), now)
+
+    msg = Object(author=Object(id="user0"))
+    return lambda: mapping.get_bucket(msg, now)
+
+
+@benchmark("cooldowns.get_bucket.10")
+def bucket_10():
+    return _bucket(10)
+
+
+@benchmark("cooldowns.get_bucket.1000")
+def bucket_1000():
+    return _bucket(1000)
+
+
+@benchmark("cooldowns.get_bucket.10000")
+def bucket_10000():
+    return _bucket(10000)
+
+
+# event dispatch
+
+def _fan_out(listeners):
+    bot = _make_bot(0)
+    for _ in range(listeners):
+        bot.add_listener(lambda value: None, "on_bench")
+    return lambda: bot._inner_dispatch("bench", 1)
+
+
+@benchmark("dispatch.fan_out.1")
+def fan_out_1():
+    return _fan_out(1)
+
+
+@benchmark("dispatch.fan_out.10")
+def fan_out_10():
+    return _fan_out(10)
+
+
+@benchmark("dispatch.fan_out.100")
+def fan_out_100():
+    return _fan_out(100)
+
+
+# a whole chat message, from Execute to the reply being sent, with the Parent calls it makes
+
+@benchmark("execute.command", parent_budget=11)
+def execute_command():
+    bot = ext.Bot(prefix="!", enable_parent_stats=True)
+
+    @bot.command()
+    def points(msg):
+        msg.reply("{0} has {1} points".format(msg.author.name, msg.author.points))
+
+    runtime = HeadlessRuntime(bot).init()
+    data = HeadlessData("someone", "!points")
+
+    def func():
+        runtime.execute(data)
+        runtime.tick()
+    return func, bot
+
+
+# tasks
+
+def _sleepers(count):
+    bot = ext.Bot(prefix="!", clock=ext.VirtualClock())
+    HeadlessRuntime(bot).init()
+
+    def sleeper():
+        yield ext.sleep(3600)
+
+    for _ in range(count):
+        bot.create_task(sleeper())
+    return bot
+
+
+@benchmark("tasks.tick.10000_sleeping")
+def tasks_tick():
+    # nothing is due, so this should not depend on the amount of sleeping tasks
+    return _sleepers(10000).tasks.tick
+
+
+@benchmark("tasks.resume.wait_for")
+def tasks_wait_for():
+    bot = _sleepers(0)
+
+    def waiter():
+        while True:
+            yield ext.wait_for("bench")
+
+    bot.create_task(waiter())
+    return lambda: bot._inner_dispatch("bench", 1)
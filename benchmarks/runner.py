@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import io
+import sys
+import json
+import platform
+from collections import OrderedDict
+
+from extension.clock import perf_timer as _timer
+
+__all__ = [
+    "benchmark",
+    "registry",
+    "measure",
+    "parent_calls",
+    "run",
+    "compare",
+    "main"
+]
+
+
+# name -> setup function. the setup function returns the callable to time
+registry = OrderedDict()
+# name -> the most Parent calls a single call of the benchmark may make
+budgets = {}
+
+
+def benchmark(name, parent_budget=None):
+    """
+    registers a benchmark. the decorated function does any setup, and returns a callable which is timed.
+    it can also return a ``(callable, bot)`` tuple, for a bot created with ``enable_parent_stats=True``, in which case
+    the Parent calls made per call are recorded too. if *parent_budget* is given, the run fails when more
+    Parent calls than that are made per call.
+    """
+    def wrapped(func):
+        if name in registry:
+            raise ValueError("duplicate benchmark: " + name)
+        registry[name] = func
+        if parent_budget is not None:
+            budgets[name] = parent_budget
+        return func
+    return wrapped
+
+
+def parent_calls(func, bot, calls=100):
+    """
+    calls *func* *calls* times, and returns the average amount of calls made into Parent per call, by method
+    """
+    stats = bot.parent_stats
+    stats.reset()
+    for _ in range(calls):
+        func()
+    ret = dict((method, count / float(calls)) for method, count in stats.methods().items())
+    stats.reset()
+    return ret
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """
+    times *func*, and returns the fastest time per call (in seconds) over *repeat* runs.
+    the amount of calls per run is raised until a run takes at least *min_time* seconds.
+    """
+    loops = 1
+    while True:
+        start = _timer()
+        for _ in range(loops):
+            func()
+        taken = _timer() - start
+        if taken >= min_time:
+            break
+        loops *= 2 if taken > min_time / 4 else 10
+
+    best = taken / loops
+    for _ in range(repeat - 1):
+        start = _timer()
+        for _ in range(loops):
+            func()
+        best = min(best, (_timer() - start) / loops)
+    return best, loops
+
+
+def run(prefixes=(), repeat=5, min_time=0.05, out=sys.stdout):
+    """
+    runs every benchmark whose name starts with one of *prefixes* (or all of them), and returns the results
+    """
+    results = OrderedDict()
+    for name, setup in registry.items():
+        if prefixes and not any(name.startswith(prefix) for prefix in prefixes):
+            continue
+
+        func = setup()
+        func, bot = func if isinstance(func, tuple) else (func, None)
+        per_call, loops = measure(func, repeat, min_time)
+        results[name] = result = {"per_call": per_call, "loops": loops}
+        if out is not None:
+            out.write("{0:<40} {1:>12.3f} us  ({2} loops)\n".format(name, per_call * 1e6, loops))
+
+        if bot is not None and bot.parent_stats is not None:
+            result["parent_calls"] = calls = parent_calls(func, bot)
+            total = sum(calls.values())
+            if name in budgets and total > budgets[name]:
+                result["over_budget"] = True
+            if out is not None:
+                out.write("{0:<40} {1:>12.2f} Parent calls{2}\n".format(
+                    "", total, " (budget {0})".format(budgets[name]) if name in budgets else ""))
+    return results
+
+
+def compare(results, baseline, threshold=0.1, out=sys.stdout):
+    """
+    compares *results* against *baseline*, and returns the names of the benchmarks that got slower than
+    the baseline by more than *threshold* (0.1 is 10%), or that make more Parent calls than before
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        # Parent calls are deterministic, so any increase is a regression
+        before_calls = baseline[name].get("parent_calls", {})
+        for method, calls in sorted(result.get("parent_calls", {}).items()):
+            if calls > before_calls.get(method, 0.0) + 1e-9:
+                if name not in regressions:
+                    regressions.append(name)
+                if out is not None:
+                    out.write("{0:<40} {1} Parent calls: {2:g} -> {3:g} REGRESSION\n".format(
+                        name, method, before_calls.get(method, 0.0), calls))
+
+        before = baseline[name]["per_call"]
+        change = (result["per_call"] - before) / before if before else 0.0
+        if change > threshold:
+            if name not in regressions:
+                regressions.append(name)
+            status = "REGRESSION"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = ""
+
+        if out is not None:
+            out.write("{0:<40} {1:>10.3f} us -> {2:>10.3f} us {3:>+7.1%} {4}\n".format(
+                name, before * 1e6, result["per_call"] * 1e6, change, status))
+    return regressions
+
+
+def _environment():
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system()}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="runs the framework's microbenchmarks")
+    parser.add_argument("prefixes", nargs="*", help="only run benchmarks whose name starts with one of these")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark, the fastest is kept")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per run")
+    parser.add_argument("--save", help="write the results to this json file")
+    parser.add_argument("--compare", help="compare the results against this json baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in registry:
+            print(name)
+        return 0
+
+    results = run(args.prefixes, args.repeat, args.min_time)
+    over_budget = [name for name, result in results.items() if result.get("over_budget")]
+    if args.save:
+        with io.open(args.save, "w", encoding="utf-8") as f:
+            f.write(u"" + json.dumps({"environment": _environment(), "results": results}, indent=2, sort_keys=True))
+
+    if args.compare:
+        with io.open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        if baseline.get("environment") != _environment():
+            print("warning: the baseline was recorded on a different environment: {0}".format(
+                baseline.get("environment")))
+
+        print("")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print("{0} benchmark(s) regressed: {1}".format(len(regressions), ", ".join(regressions)))
+            return 1
+
+    if over_budget:
+        print("{0} benchmark(s) made more Parent calls than their budget: {1}".format(
+            len(over_budget), ", ".join(over_budget)))
+        return 1
+    return 0
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+"""
+startup benchmarks: how long it takes to import the framework in a fresh interpreter, and to create and
+initialize a bot. ``python -m benchmarks.startup`` prints a per-module breakdown of the import time.
+"""
+import os
+import sys
+import json
+import subprocess
+
+import extension as ext
+from extension.headless import HeadlessRuntime
+
+from .runner import benchmark
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs in a fresh interpreter. every import is timed, and attributed to the modules it loaded, which gives the
+# cumulative and own (minus nested imports) time of each module. this works on any interpreter, unlike -X importtime
+_probe = r"""
+import sys, time, json
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+# extension.clock.perf_timer can't be used here, importing extension is what's being timed
+timer = getattr(time, "perf_counter", time.time)
+original = builtins.__import__
+stack = []
+claimed = set()
+times = {}
+
+def timed(*args, **kwargs):
+    before = set(sys.modules)
+    stack.append(0.0)
+    start = timer()
+    try:
+        return original(*args, **kwargs)
+    finally:
+        elapsed = timer() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        new = [name for name in set(sys.modules) - before if name not in claimed]
+        if new:
+            claimed.update(new)
+            times[min(new, key=len)] = (elapsed, elapsed - nested)
+
+builtins.__import__ = timed
+start = timer()
+import extension
+total = timer() - start
+builtins.__import__ = original
+sys.stdout.write(json.dumps({"total": total, "modules": times}))
+"""
+
+
+def import_times():
+    """
+    imports the framework in a fresh interpreter, and returns the total import time and a dict of
+    module name to its ``(cumulative, own)`` import time, in seconds
+    """
+    output = subprocess.check_output([sys.executable, "-c", _probe], cwd=_root)
+    data = json.loads(output.decode("utf-8"))
+    return data["total"], dict((name, tuple(times)) for name, times in data["modules"].items())
+
+
+@benchmark("startup.interpreter")
+def startup_interpreter():
+    # the cost of starting the interpreter itself, to compare startup.import against
+    return lambda: subprocess.check_call([sys.executable, "-c", "pass"], cwd=_root)
+
+
+@benchmark("startup.import")
+def startup_import():
+    return lambda: subprocess.check_call([sys.executable, "-c", "import extension"], cwd=_root)
+
+
+@benchmark("startup.bot")
+def startup_bot():
+    # creating and initializing a bot, as the chatbot does on every script (re)load
+    def func():
+        bot = ext.Bot()
+        HeadlessRuntime(bot).init()
+    return func
+
+
+def main(amount=25):
+    total, modules = import_times()
+    print("import extension: {0:.2f}ms\n".format(total * 1000))
+    print("{0:<40} {1:>12} {2:>12}".format("module", "cumulative", "own"))
+    ranked = sorted(modules.items(), key=lambda x: x[1][1], reverse=True)
+    for name, (cumulative, own) in ranked[:amount]:
+        print("{0:<40} {1:>10.2f}ms {2:>10.2f}ms".format(name, cumulative * 1000, own * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+"""
+a stress test of the bot's ingress queue: several threads dispatch events, the way the .NET socket threads do,
+while the main thread keeps ticking. every event has to be dispatched exactly once, in the order each thread
+sent them. run it from the repository root with::
+
+    python -m benchmarks.stress
+    python -m benchmarks.stress --producers 16 --events 5000
+"""
+import sys
+import time
+import random
+import argparse
+import threading
+
+import extension as ext
+from extension.headless import HeadlessRuntime
+
+
+def run(producers=8, events=2000, seed=None, timeout=60.0):
+    """
+    runs the stress test, and returns ``(problems, elapsed, ticks)``.
+    *problems* is a list of descriptions of lost, duplicated or reordered events, which is empty when the test passed
+    """
+    bot = ext.Bot()
+    received = dict((producer, []) for producer in range(producers))
+
+    @bot.listen()
+    def on_stress(producer, number):
+        received[producer].append(number)
+
+    runtime = HeadlessRuntime(bot).init()
+    # let on_init through, so only stress events are left in the queue
+    runtime.tick(2)
+
+    start = threading.Event()
+
+    def produce(producer):
+        rng = random.Random(None if seed is None else seed + producer)
+        start.wait()
+        for number in range(events):
+            bot.dispatch("stress", producer, number)
+            if rng.random() < 0.01:
+                # give the tick loop a chance to run in the middle of a burst
+                time.sleep(0)
+
+    threads = [threading.Thread(target=produce, args=(producer,)) for producer in range(producers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    began = time.time()
+    deadline = began + timeout
+    ticks = 0
+    start.set()
+    while time.time() < deadline:
+        producing = any(thread.is_alive() for thread in threads)
+        runtime.tick()
+        ticks += 1
+        if not producing and not bot.pending_events:
+            break
+    elapsed = time.time() - began
+
+    problems = []
+    for producer, numbers in sorted(received.items()):
+        if numbers != list(range(events)):
+            missing = events - len(set(numbers))
+            duplicated = len(numbers) - len(set(numbers))
+            problems.append("producer {0}: {1} events, {2} missing, {3} duplicated, in order: {4}".format(
+                producer, len(numbers), missing, duplicated, numbers == sorted(numbers)))
+    if bot.pending_events:
+        problems.append("{0} events still queued after {1:.0f}s".format(bot.pending_events, timeout))
+
+    runtime.unload()
+    return problems, elapsed, ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stress", description="stress tests the ingress queue")
+    parser.add_argument("--producers", type=int, default=8, help="the amount of producer threads")
+    parser.add_argument("--events", type=int, default=2000, help="the amount of events each producer sends")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    problems, elapsed, ticks = run(args.producers, args.events, args.seed)
+    print("{0} producers x {1} events, {2} ticks in {3:.2f}s".format(args.producers, args.events, ticks, elapsed))
+    for problem in problems:
+        print(problem)
+    print("FAILED" if problems else "OK")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
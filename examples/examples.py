@@ -24,6 +24,18 @@ ext.Bot(enable_debug=True)
 # the dev command group can be used by doing `!dev {subcommand}` in your chat.
 # the dev command currently has the `sudo` command, which runs another command, bypassing all checks and cooldowns
 # and the `su` command, which can be used to run a command as someone else.
+# `!dev trace <subsystem> <level>` turns tracing on or off while the bot is running, see below.
+
+# tracing has a level per subsystem (scheduler, dispatch, commands, events), which can also be set from code.
+# messages are only formatted when their level is enabled, so leaving trace calls in is cheap
+bot.tracer.set_level("commands", ext.TraceLevel.debug)
+bot.tracer.debug("commands", "{0} did something", "someone")
+
+# Bot(enable_parent_stats=True) counts every call into Parent (and the time it took), per command, listener and event.
+# `!dev parent-stats` replies with the most expensive ones, and bot.parent_stats can be inspected directly.
+# it is None when the bot was created without enable_parent_stats
+if bot.parent_stats is not None:
+    bot.parent_stats.calls("HasPermission", origin="command:points")
 
 ##########
 
@@ -167,6 +179,23 @@ def on_donation(user, amount, currency):
     # amount is a float, unsure what currency is (i cant test it as im not affilate nor do i have a viewerbase)
     pass
 
+# the users given to the stream events are ext.PartialUser objects. they act like an ext.User, but the user is only
+# looked up once you use something other than the name or id, so events for users you dont look at are cheap.
+
+# events can come in bulk (follows, mass gifted subs, etc). each event also has a *_batch version, which is dispatched
+# once per tick with everything that came in during that tick, IE on_follow_batch, on_cheer_batch, on_sub_batch,
+# on_resub_batch, on_streak_sub_batch, on_gift_sub_batch and on_donation_batch
+
+@bot.listen()
+def on_follow_batch(users):
+    # a list of users
+    pass
+
+@bot.listen()
+def on_gift_sub_batch(gifts):
+    # a list of (user, gifter) tuples. the other batches also give tuples, in the same order as their single events
+    pass
+
 @bot.listen()
 def on_raid(raider_name, count):
     # note that raider_name is the users name, not a User object
@@ -195,6 +224,10 @@ def on_event_receive(sender, args):
 bot.settings.FieldName
 # where FieldName is the key in your UI_Config
 
+# bot.settings.save() writes the settings back to your output file. the write happens in the background a few seconds
+# after the last save, so saving often is cheap. your own json files can be written the same way
+bot.persistence.mark_dirty(os.path.join(os.path.dirname(__file__), "counters.json"), lambda: {"deaths": 10})
+
 #### nodes
 
 # nodes can be created to make your code nicer, or to have commands in other files and batch load them into your bot
@@ -211,3 +244,108 @@ class MyNode(ext.Node):
 
 # and can be added to the bot using
 bot.add_node(MyNode(bot))
+
+#### overlays
+
+# events sent through bot.ws are batched, and sent to your overlays once per tick as a single "EXTENSION_BATCH" event,
+# which holds a list of {"event": ..., "data": ...} objects.
+# passing a key means only the latest value for that key is sent, which is great for counters
+bot.ws.send("counter", {"value": 10}, key="deaths")
+# events that must be sent on their own can skip the batch
+bot.ws.send("alert", {"user": "someone"}, immediate=True)
+
+#### running without the chatbot
+
+# scripts can be run, tested and benchmarked under plain python (no .NET needed). HeadlessParent stands in for Parent.
+# these modules are only for development, so they aren't imported with the package
+from extension_example import headless, loadgen
+parent = headless.HeadlessParent()
+parent.points["someone"] = 100
+runtime = headless.HeadlessRuntime(bot, parent).init()
+runtime.chat("someone", "!mycommand hello")
+runtime.tick(5)
+print(parent.sent) # [("stream", None, "...")]
+# with a VirtualClock, scheduled events, cooldowns and uptime can be simulated without waiting for them
+bot = ext.Bot(clock=ext.VirtualClock())
+runtime = headless.HeadlessRuntime(bot).init()
+runtime.advance(3600) # an hour of ticks, in a fraction of a second
+# or run a whole script file the way the chatbot would
+runtime = headless.HeadlessRuntime.load_script("MyScript_StreamlabsSystem.py").init()
+
+# recorded sessions (see extension.replay.load_session for the format) can be replayed against a script, which reports
+# throughput, latency and queue depth, and can diff the messages your bot sent against an earlier run:
+#   python -m extension.replay MyScript_StreamlabsSystem.py session.jsonl --record expected.txt
+#   python -m extension.replay MyScript_StreamlabsSystem.py session.jsonl --expect expected.txt --realtime
+
+# synthetic load, IE a 50k viewer raid in the middle of a chat burst, can be generated from a seed and fed to the bot
+profile = loadgen.LoadProfile.from_bot(bot, duration=60, users=5000, rate=50, bursts=[loadgen.Burst(20, 10, 5)],
+                                       raids=[loadgen.Raid(30, 50000)], seed=1)
+print(loadgen.LoadGenerator(profile).run(headless.HeadlessRuntime(bot).init()).format())
+
+#### tasks
+
+# commands and listeners can be generators. they run as tasks, which the bot resumes from Tick, so they can wait
+# without blocking the chatbot
+@bot.command()
+def countdown(msg, seconds=int):
+    for i in range(seconds, 0, -1):
+        msg.reply(str(i))
+        yield ext.sleep(1)
+    msg.reply("go!")
+
+@bot.command()
+def duel(msg, target=str):
+    msg.reply("{0}, type !accept to duel {1}".format(target, msg.author.name))
+    try:
+        # resumes with the on_message arguments, once the check passes
+        yield ext.wait_for("message", lambda data: data.User == target.lower() and data.Message == "!accept", timeout=30)
+    except ext.TaskTimeout:
+        msg.reply("{0} didn't accept".format(target))
+    else:
+        msg.reply("fight!")
+
+# tasks can also wait on a Future (future.set_result(value) resumes them with the value) or on other tasks,
+# and can be cancelled
+answer = ext.Future()
+
+def wait_for_answer():
+    value = yield answer
+    bot.stream.send("the answer is {0}".format(value))
+
+task = bot.create_task(wait_for_answer())
+answer.set_result(42) # the task sends its message on the next tick
+task.cancel() # or stop it before it gets there
+
+#### worker threads
+
+# commands and listeners that block (file I/O, slow libraries) can be run on the bot's worker pool instead.
+# off_thread goes under the command or listener decorator. limit is how many calls may run at once, and the policy
+# says what happens to calls past that: "queue" waits for a free slot, "drop" ignores them and "busy" replies
+# with busy_message
+@bot.command()
+@ext.off_thread(limit=1, policy="busy", busy_message="still working on the last one!")
+def backup(msg):
+    with open("backup.txt", "w") as f:
+        f.write(str(msg.bot.viewers))
+    msg.reply("backed up!")
+
+# inside a worker, bot.parent and msg.parent run each Parent call on the chatbot thread during the next tick,
+# so they are safe to use. http requests (bot.api_get, bot.api_post) are the exception, they run on the worker itself.
+# the pool size is set with Bot(worker_threads=4)
+
+#### loops
+
+# functions can be run every so often with bot.loop. loops start when the bot is initialized, and run from Tick.
+# the next run is timed from when the last one was due, so they don't drift. jitter delays each run by a random
+# amount up to that many seconds, which spreads out loops that have the same interval
+@bot.loop(minutes=15, jitter=5)
+def announcement():
+    bot.stream.send("remember to follow!")
+
+# loops can be stopped, started again and sped up or slowed down at any time
+@bot.command()
+def hype(msg):
+    announcement.change_interval(minutes=5)
+
+# announcement.iterations, announcement.missed and announcement.durations (how long each run took) show how a loop
+# is doing, and the dev loops command replies with them
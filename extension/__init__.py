@@ -35,15 +35,17 @@ from .message import *
 from .view import *
 from .node import *
 from .checks import *
-from .settings import Settings
-import clr
-import os
-
-clr.AddReference("IronPython.Modules.dll")
-clr.AddReferenceToFileAndPath(os.path.join(os.path.dirname(__file__), "bin", "TwitchLib.PubSub.dll"))
-clr.AddReferenceToFileAndPath(os.path.join(os.path.dirname(__file__), "bin", "StreamlabsEventReceiver.dll"))
-
-del clr, os
+from .cache import *
+from .clock import *
+from .tasks import *
+from .loops import *
+from .asynchandlers import Future, off_thread, WorkerPool
+from .broadcast import *
+from .metrics import *
+from .spans import *
+from .settings import Settings, ReloadPayload, WriteBehind
+from .errorhandler import Logger, Tracer, TraceLevel, ErrorAggregator
+from . import dotnet
 
 __version__ = "0.3.0"
 version_tuple = (0,3,0)
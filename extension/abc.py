@@ -35,7 +35,9 @@ __all__ = [
     "Union",
     "Event",
     "Channel",
-    "User"
+    "User",
+    "PartialUser",
+    "Response"
 ]
 
 class Platforms:
@@ -90,7 +92,10 @@ class _Union(object):
     def __init__(self):
         self.types = [str]
 
-    def __getitem__(self, *items):
+    def __getitem__(self, items):
+        # Union[int, str] passes the types as a single tuple
+        if not isinstance(items, tuple):
+            items = (items,)
         ret = self.__class__()
         ret.types = list(items)
         return ret
@@ -102,9 +107,17 @@ class Event(object):
     a container to hold scheduled :ref:`events` internally in the :ref:`bot`
     Do not create these manually
     """
-    __slots__ = ["_fire_at", "_flag", "_bot", "args", "kwargs", "_did_fire"]
+    __slots__ = ["_fire_at", "_flag", "_bot", "args", "kwargs", "_did_fire", "_created", "trace", "origin"]
     def __init__(self, bot, delay, flag, *args, **kwargs):
-        self._fire_at = time.time() + delay
+        self._fire_at = bot.clock.time() + delay
+        # the trace of the packet this event came from, when tracing is enabled
+        if bot.spans is not None:
+            self.trace = bot.spans.current
+            self._created = bot.spans.timer()
+        else:
+            self.trace = self._created = None
+        # what scheduled this event, when Parent calls are being counted
+        self.origin = bot.parent_stats.origin if bot.parent_stats is not None else None
         self._flag = flag
         self.args = args
         self.kwargs = kwargs
@@ -121,13 +134,21 @@ class Event(object):
         return round(self._fire_at)
     
     def should_dispatch(self):
-        return time.time() >= self._fire_at and not self._did_fire
+        return self._bot.clock.time() >= self._fire_at and not self._did_fire
     
     def dispatch(self):
         if self._did_fire:
             raise EventAlreadyFired("the event with flag {} has already been fired".format(self.flag))
 
-        self._bot._inner_dispatch(self._flag, *self.args, **self.kwargs)
+        stats = self._bot.parent_stats
+        if stats is None:
+            self._bot._inner_dispatch(self._flag, *self.args, **self.kwargs)
+        else:
+            stats.push(self.origin or "event:on_" + self._flag)
+            try:
+                self._bot._inner_dispatch(self._flag, *self.args, **self.kwargs)
+            finally:
+                stats.pop()
         self._did_fire = True
     
     @property
@@ -250,3 +271,77 @@ class User(object):
     def has_permission(self, permission, arg=""):
         return self.__bot.parent.HasPermission(self.id, permission, arg)
 
+
+class PartialUser(object):
+    """
+    a lightweight reference to a user, given by the streamlabs events.
+    only the name and id are known up front, the full :class:`User` is looked up the first time any other
+    attribute is accessed, so events for users you never look at cost nothing.
+    """
+    def __init__(self, bot, name):
+        self._bot = bot
+        self._user = None
+        self.name = name
+        self.id = name.lower()
+
+    @property
+    def user(self):
+        """
+        the full :class:`User` this refers to
+        """
+        if self._user is None:
+            self._user = self._bot.get_user(self.id)
+        return self._user
+
+    def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
+        return getattr(self.user, item)
+
+    def __eq__(self, other):
+        if not isinstance(other, (User, PartialUser)):
+            return False
+
+        return other.id == self.id
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return "<PartialUser {0}>".format(self.name)
+
+
+class Response(object):
+    """
+    the response to a request made through :meth:`Bot.api_get`.
+    the keys of the json returned by the chatbot are available both as attributes and by indexing,
+    IE ``response.status`` or ``response["response"]``
+    """
+    __slots__ = ("_data",)
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, item):
+        try:
+            return self._data[item]
+        except KeyError:
+            raise AttributeError(item)
+
+    def __getitem__(self, item):
+        return self._data[item]
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def get(self, item, default=None):
+        return self._data.get(item, default)
+
+    @property
+    def status(self):
+        return self._data.get("status")
+
+    def __repr__(self):
+        return "<Response status: {0}>".format(self.status)
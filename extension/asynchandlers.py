@@ -1,26 +1,80 @@
 import sys
+import inspect
+import logging
+import threading
+import collections
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
 __all__ = (
     "Future",
+    "off_thread",
+    "WorkerPool",
 )
 
-class Future:
-    def __init__(self, bot, flag):
+logger = logging.getLogger(__name__)
+
+class Future(object):
+    def __init__(self, bot=None, flag=None):
         self._bot = bot
         self._callback = None
         self._complete = False
         self._flag = flag
+        self._result = None
+        self._waiters = []
+        # guards _complete and _waiters, as the result can be set from another thread
+        self._lock = threading.Lock()
 
     @property
     def callback(self):
         return self._callback
 
+    @property
+    def done(self):
+        return self._complete
+
+    @property
+    def result(self):
+        return self._result
+
     def then(self, callback):
         if not callable(callback):
             raise ValueError("callback is not a callable")
 
         self._callback = callback
 
+    def add_waiter(self, waiter):
+        """
+        calls *waiter* with this future once it has a result. tasks that yield a future wait through this
+        """
+        with self._lock:
+            if not self._complete:
+                self._waiters.append(waiter)
+                return
+        waiter(self)
+
+    def set_result(self, value=None):
+        """
+        completes the future, waking anything waiting on it. this is safe to call from any thread,
+        tasks waiting on it are resumed on the next tick.
+        """
+        with self._lock:
+            if self._complete:
+                return
+
+            self._result = value
+            self._complete = True
+            waiters, self._waiters = self._waiters, []
+
+        if self._callback is not None:
+            self.fire(value)
+
+        for waiter in waiters:
+            waiter(self)
+
     def wakeup_waiter(self, event, *args, **kwargs):
         if event == "on_" + self._flag:
             self.fire(*args, **kwargs)
@@ -30,3 +84,233 @@ class Future:
             self._callback(*args, **kwargs)
         except Exception as e:
             self._bot.dispatch("error", e, sys.exc_info()[2])
+
+
+class _OffThread(object):
+    # the settings of an off-thread function, plus how many of its calls are running and waiting
+    __slots__ = ("limit", "policy", "busy_message", "max_queue", "running", "backlog", "dropped")
+
+    def __init__(self, limit, policy, busy_message, max_queue):
+        self.limit = limit
+        self.policy = policy
+        self.busy_message = busy_message
+        self.max_queue = max_queue
+        self.running = 0
+        self.backlog = collections.deque()
+        self.dropped = 0
+
+
+def off_thread(limit=1, policy="queue", busy_message="I'm busy, try again in a bit", max_queue=50):
+    """
+    marks a command or listener to run on the bot's worker pool, instead of on the chatbot's thread.
+    use this for anything that blocks, such as file I/O or web requests.
+    Parent calls made from the worker (through :attr:`Bot.parent`) are run on the chatbot thread on the next tick,
+    and the worker waits for their result. replies and sends are handed over whole, so they are parsed and sent
+    on the chatbot thread, without the worker waiting for them. http requests (:meth:`Bot.api_get` and friends)
+    are made straight from the worker, as they are what would stall the chat.
+    this decorator goes under the command or listener decorator, and can't be used on generators.
+
+    Parameters
+    -----------
+    limit: how many calls of the function may run at once
+    policy: what to do with a call when *limit* calls are already running.
+        ``"queue"`` runs it once one finishes (up to *max_queue* waiting calls, the rest are dropped),
+        ``"drop"`` ignores it, and ``"busy"`` replies *busy_message* (for commands, listeners drop the call)
+    """
+    if policy not in ("queue", "drop", "busy"):
+        raise ValueError("policy must be one of queue, drop or busy")
+
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            raise TypeError("off_thread functions can't be generators, {0} would never run. "
+                            "generators already run as tasks without blocking".format(func.__name__))
+        func.__off_thread__ = _OffThread(limit, policy, busy_message, max_queue)
+        return func
+    return decorator
+
+
+class _Call(object):
+    # a Parent call (by method name) or a function, handed over by a worker to be run on the chatbot thread
+    __slots__ = ("method", "args", "kwargs", "done", "result", "error")
+
+    def __init__(self, method, args, kwargs, wait):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event() if wait else None
+        self.result = None
+        self.error = None
+
+
+class _MarshalledParent(object):
+    """
+    what :attr:`Bot.parent` returns on a worker thread. every call is queued to run on the chatbot thread.
+    calls that don't return anything useful don't wait for the chatbot thread, and http requests skip it entirely.
+    """
+    fire_and_forget = frozenset(("SendStreamMessage", "SendStreamWhisper", "SendDiscordMessage", "SendDiscordDM",
+                                 "Log", "PlaySound", "BroadcastWSEvent"))
+    # these block on the network, not on chatbot state. running them on the chatbot thread would stall the chat,
+    # and a worker leading an api_cache request would deadlock against the chatbot thread waiting on the same request
+    direct = frozenset(("GetRequest", "PostRequest", "PutRequest", "DeleteRequest"))
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def __getattr__(self, name):
+        pool = self._pool
+        if name in self.direct:
+            return getattr(pool._parent(), name)
+
+        wait = name not in self.fire_and_forget
+
+        def method(*args, **kwargs):
+            call = _Call(name, args, kwargs, wait)
+            pool._calls.append(call)
+            if not wait:
+                return None
+
+            if not call.done.wait(pool.call_timeout):
+                raise RuntimeError("Parent.{0} wasn't run within {1} seconds, is the bot ticking?".format(
+                    name, pool.call_timeout))
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        setattr(self, name, method)
+        return method
+
+
+class WorkerPool(object):
+    """
+    the bounded thread pool that runs :func:`off_thread` functions, available as :attr:`Bot.pool`.
+    threads are started as they are needed, up to *size*.
+    """
+    call_timeout = 30.0
+
+    def __init__(self, bot, parent, size=4):
+        self._bot = bot
+        self._parent = parent
+        self.size = size
+        self.parent = _MarshalledParent(self)
+        self._jobs = queue.Queue()
+        self._calls = collections.deque()
+        self._errors = collections.deque()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle = 0
+        self._closed = False
+
+    def in_worker(self):
+        return getattr(self._local, "worker", False)
+
+    def submit(self, spec, func, args=(), kwargs=None, on_busy=None, on_error=None):
+        """
+        runs *func* on the pool, following the concurrency limit and policy of *spec*.
+        returns whether the call is running or queued
+        """
+        job = (spec, func, args, kwargs or {}, on_error)
+        with self._lock:
+            if self._closed:
+                return False
+
+            if spec.running >= spec.limit:
+                if spec.policy == "queue" and len(spec.backlog) < spec.max_queue:
+                    spec.backlog.append(job)
+                    return True
+
+                spec.dropped += 1
+                busy = spec.policy == "busy" and on_busy is not None
+            else:
+                spec.running += 1
+                self._start(job)
+                return True
+
+        if busy:
+            on_busy()
+        return False
+
+    def _start(self, job):
+        # called with the lock held. _idle counts the threads waiting for a job that nobody has claimed yet
+        if self._idle:
+            self._idle -= 1
+        elif len(self._threads) < self.size:
+            thread = threading.Thread(target=self._work, name="extension-worker-{0}".format(len(self._threads)))
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+        self._jobs.put(job)
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            spec, func, args, kwargs, on_error = job
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                # error handlers are run on the chatbot thread, along with the Parent calls
+                self._errors.append((on_error, e, sys.exc_info()[2]))
+
+            with self._lock:
+                if spec.backlog and not self._closed:
+                    # the queued call takes over this thread's slot
+                    self._jobs.put(spec.backlog.popleft())
+                else:
+                    spec.running -= 1
+                    self._idle += 1
+
+    def call_soon(self, func, *args, **kwargs):
+        """
+        runs *func* on the chatbot thread on the next tick, in order with the Parent calls of the workers.
+        this doesn't wait for it to run
+        """
+        self._calls.append(_Call(func, args, kwargs, False))
+
+    def tick(self):
+        """
+        runs the Parent calls and functions handed over by workers. called by the bot every tick
+        """
+        calls = self._calls
+        while calls:
+            call = calls.popleft()
+            if callable(call.method):
+                try:
+                    call.method(*call.args, **call.kwargs)
+                except Exception as e:
+                    self._bot.dispatch("error", e, sys.exc_info()[2])
+                continue
+
+            try:
+                call.result = getattr(self._parent(), call.method)(*call.args, **call.kwargs)
+            except Exception as e:
+                if call.done is None:
+                    logger.exception("Parent.%s failed when called from a worker", call.method)
+                call.error = e
+            if call.done is not None:
+                call.done.set()
+
+        errors = self._errors
+        while errors:
+            on_error, e, tb = errors.popleft()
+            if on_error is not None:
+                on_error(e, tb)
+            else:
+                self._bot.dispatch("error", e, tb)
+
+    def close(self):
+        """
+        stops the workers once they finish their current job. queued calls are dropped
+        """
+        with self._lock:
+            self._closed = True
+            for _ in self._threads:
+                self._jobs.put(None)
+        # anything still waiting on a Parent call gets its result now, rather than timing out
+        self.tick()
+        # give idle workers a moment to exit, busy ones are left to finish on their own
+        for thread in self._threads:
+            thread.join(0.05)
@@ -27,23 +27,43 @@ DEALINGS IN THE SOFTWARE.
 import collections
 import logging
 import json
-import datetime
 import time
 import sys
-import clr
 import re
 import traceback
 import random
+import threading
+import types
 import os
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
+
 from .errors import *
+from .errors import UserInputError
 from .abc import *
 from .abc import BotBase
 from .message import Message
 from .commands import *
-from .settings import Settings
+from .settings import Settings, ReloadPayload, WriteBehind
 from .debugger import Debug
+from .errorhandler import Tracer, TraceLevel, ErrorAggregator
 from .node import Node
+from .cache import APICache, EventDeduplicator
+from .broadcast import WSChannel
+from .metrics import MetricsRegistry, ParentStats, ParentProxy, _Timing
+from .spans import SpanRecorder
+from .clock import SystemClock
+from .tasks import TaskScheduler
+from .loops import Loop
+from .asynchandlers import WorkerPool
 
 
 __all__ = [
@@ -54,10 +74,6 @@ scriptdir = os.path.dirname(os.path.dirname(__file__))
 reUserNotice = re.compile(r"(?:^(?:@(?P<irctags>[^\ ]*)\ )?:tmi\.twitch\.tv\ USERNOTICE)")
 logger = logging.getLogger(__name__)
 
-clr.AddReferenceToFileAndPath(os.path.join(os.path.dirname(__file__), "bin", "StreamlabsEventReceiver.dll"))
-
-from .events import EventsNode
-
 class Bot(GroupMapping, BotBase):
     def __init__(self, prefix="!", client_id=None, settings=Settings, **kwargs):
         self.__parent = None
@@ -69,28 +85,56 @@ class Bot(GroupMapping, BotBase):
 
         self._parser = None
         self.__script_globals = {}
+        # set once the globals are given explicitly (IE by a HeadlessRuntime), so later decorators don't replace them
+        self._explicit_globals = False
+        # everything time dependent (scheduled events, cooldowns, caches, uptime) reads the time from here
+        self.clock = kwargs.get("clock") or SystemClock()
         self._do_parameters = kwargs.get("do_parameters", True)
         self.settings = settings()
+        self.persistence = WriteBehind(kwargs.get("save_interval", 5.0), timer=self.clock.time)
+        self.settings._writer = self.persistence
 
         # i dont know the platform until the first data event comes through
         # so just set it to `None` for now
         self._platform = None
         self._scheduled_events = []
+        self._log_buffer = collections.deque()
+        # events can be dispatched from the .NET socket threads, so new events go through a locked queue,
+        # which is drained into the scheduler at the start of each tick.
+        self._ingress = collections.deque()
+        self._ingress_lock = threading.Lock()
         GroupMapping.__init__(self, **kwargs)
 
         # no, this is not a mistake. we do this because when a command is registered, GroupMapping passes self._bot
         # to the command.
         self._bot = self
 
-        self.random = random.WichmannHill()
+        # WichmannHill only exists on python 2
+        self.random = random.WichmannHill() if hasattr(random, "WichmannHill") else random.Random()
         self.stream = self.get_channel(Platforms.twitch) # this works, as all the streaming channels are the same.
         self.discord = self.get_channel(Platforms.discord)
         self._live_dt = None
         self._api = BrowserWindow(self, time.time())
-        self._events = EventsNode(self)
-
+        # the streamlabs socket is only set up once a token is configured, see _require_events
+        self._events = None
+        self.api_cache = APICache(kwargs.get("api_cache_size", 256), kwargs.get("api_cache_ttl", 30.0), self.clock.time)
+        self.event_dedup = EventDeduplicator(kwargs.get("event_dedup_size", 2048), kwargs.get("event_dedup_window", 900.0),
+                                             self.clock.time, kwargs.get("event_dedup_content_window", 30.0))
+        self.ws = WSChannel(self, kwargs.get("ws_batch_event", "EXTENSION_BATCH"))
+
+        self.tracer = Tracer(self._trace_sink)
+        self.metrics = MetricsRegistry() if kwargs.get("enable_metrics", False) else None
+        self.spans = SpanRecorder(kwargs.get("trace_buffer_size", 1024)) if kwargs.get("enable_tracing", False) else None
+        self.parent_stats = ParentStats() if kwargs.get("enable_parent_stats", False) else None
+        self.tasks = TaskScheduler(self)
+        self.loops = []
+        # the worker pool for off_thread functions is only started when one is first called
+        self._pool = None
+        self._pool_size = kwargs.get("worker_threads", 4)
+        self.errors = ErrorAggregator(kwargs.get("error_window", 60.0), kwargs.get("error_reply_per", 15.0), self.clock.time)
         if kwargs.get("enable_debug", False):
             self._debug = True
+            self.tracer.set_level("all", TraceLevel.debug)
             self.add_node(Debug(self))
 
         else:
@@ -101,10 +145,22 @@ class Bot(GroupMapping, BotBase):
     @property
     def parent(self):
         """
-        returns the Parent object given by the bot
+        returns the Parent object given by the bot.
+        on a worker thread (see :func:`off_thread`) this is a stand-in that runs each call on the chatbot thread
         """
+        if self._pool is not None and self._pool.in_worker():
+            return self._pool.parent
         return self.__parent
 
+    @property
+    def pool(self):
+        """
+        the :class:`WorkerPool` that runs :func:`off_thread` commands and listeners
+        """
+        if self._pool is None:
+            self._pool = WorkerPool(self, lambda: self.__parent, self._pool_size)
+        return self._pool
+
     @property
     def platform(self):
         """
@@ -123,17 +179,31 @@ class Bot(GroupMapping, BotBase):
         Use the on_init event to load things on initialization
         """
         self.__parent = self.__script_globals['Parent']
+        if self.parent_stats is not None:
+            self.__parent = ParentProxy(self.__parent, self.parent_stats)
         self.currency_name = self.parent.GetCurrencyName()
         if self.live:
-            self._live_dt = datetime.datetime.now()
-        self._events.on_init()
+            self._live_dt = self.clock.now()
+        if self.settings.StreamlabsEventToken:
+            self._require_events().on_init()
+        for loop in self.loops:
+            if loop.autostart and not loop.running:
+                loop.start()
         self.dispatch("init")
 
     def unload(self):
         """
         this will *not* be injected into your script, however it **must** be called from inside `Unload`!
         """
-        self._events.on_unload()
+        if self._events is not None:
+            self._events.on_unload()
+        self.tasks.cancel_all()
+        if self._pool is not None:
+            self._pool.close()
+        self._api.close()
+        self.ws.flush()
+        self.persistence.flush()
+        self._flush_log()
         self.dispatch("unload")
 
     def __tick(self):
@@ -142,25 +212,45 @@ class Bot(GroupMapping, BotBase):
         Use the on_tick event to load things on initialization
         """
         if self.live and self._live_dt is None:
-            self._live_dt = datetime.datetime.now()
+            self._live_dt = self.clock.now()
 
         if not self.live and self._live_dt is not None:
             self._live_dt = None
 
+        if self._ingress:
+            with self._ingress_lock:
+                self._scheduled_events.extend(self._ingress)
+                self._ingress.clear()
+
         dispatched = 0
-        for event in self._scheduled_events:
+        pending, self._scheduled_events = self._scheduled_events, []
+        for index, event in enumerate(pending):
+            if dispatched > 3:
+                self._scheduled_events.extend(pending[index:])
+                break
+
             if event.should_dispatch():
                 dispatched += 1
-                event.dispatch()
-                self._scheduled_events.remove(event)
-
-                if dispatched > 3:
-                    break
+                if event.trace is not None:
+                    self._dispatch_traced(event)
+                else:
+                    event.dispatch()
 
             else:
-                self.debug("delaying event {0}".format(repr(event)))
-
+                self._scheduled_events.append(event)
+                if self.tracer.scheduler >= TraceLevel.trace:
+                    self.tracer.trace("scheduler", "delaying event {0!r}", event)
+
+        if self._events is not None:
+            self._events.flush()
+        self.tasks.tick()
+        if self._pool is not None:
+            self._pool.tick()
         self.dispatch("tick")
+        self.ws.flush()
+        self.persistence.tick()
+        self._report_errors()
+        self._flush_log()
 
     def __reload_settings(self, payload):
         """
@@ -172,12 +262,26 @@ class Bot(GroupMapping, BotBase):
         payload: the json string provided by the streamlabs chatbot.
         """
         formatted = json.loads(payload)
-        self.settings.reload(payload)
-        self._events.on_reload_settings()
-        for i in self.__commands.values():
-            i.namer(self)
-
-        self.dispatch("reload_settings", formatted)
+        changed = self.settings.reload(formatted)
+        if self._events is not None:
+            self._events.on_reload_settings(changed)
+        elif self.settings.StreamlabsEventToken:
+            self._require_events().on_init()
+        for command in list(self.__commands.values()):
+            old = command.name
+            if command.namer(self, changed) and command.name != old:
+                # the command is stored under its name, so move it over to the new one
+                new = command.name
+                command.name = old
+                if new in self.all_commands:
+                    logger.warning("can't rename command %s to %s, a command with that name already exists", old, new)
+                    continue
+
+                self.remove_command(old)
+                command.name = new
+                self.add_command(command)
+
+        self.dispatch("reload_settings", ReloadPayload(formatted, changed))
 
     def __execute(self, data):
         """
@@ -201,6 +305,19 @@ class Bot(GroupMapping, BotBase):
         ---------
         None
         """
+        if self.spans is None:
+            return self._handle_data(data)
+
+        trace = self.spans.new_trace("chat" if data.IsChatMessage() else "raw")
+        self.spans.current = trace
+        start = self.spans.timer()
+        try:
+            self._handle_data(data)
+        finally:
+            trace.span("execute", start, self.spans.timer())
+            self.spans.current = None
+
+    def _handle_data(self, data):
         if self._platform is None:
             if data.IsFromTwitch():
                 self._platform = Platforms.twitch
@@ -229,12 +346,59 @@ class Bot(GroupMapping, BotBase):
                     viewerCount = tags['msg-param-viewerCount']
                     self.dispatch("raid", displayName, viewerCount)
     
+    def create_task(self, generator, name=None):
+        """
+        runs a generator as a :class:`Task`, resumed from Tick. the generator can yield :func:`sleep`,
+        :func:`wait_for`, a :class:`Future` or another task. commands and listeners that are generators
+        are run as tasks automatically.
+
+        Parameters
+        -----------
+        generator: the generator, IE ``countdown(msg)``
+        name: the name of the task, used in error reports. defaults to the generator's name
+        """
+        return self.tasks.create(generator, name)
+
+    def _require_events(self):
+        """
+        returns the streamlabs :class:`EventsNode`, creating it on first use
+        """
+        if self._events is None:
+            from .events import EventsNode
+            self._events = EventsNode(self)
+        return self._events
+
+    def _dispatch_traced(self, event):
+        now = self.spans.timer()
+        event.trace.span("queue", event._created, now)
+        self.spans.current = event.trace
+        try:
+            event.dispatch()
+        finally:
+            event.trace.span("on_" + event.flag, now, self.spans.timer())
+            self.spans.current = None
+
+    def _start_timing(self, command):
+        """
+        returns the phase timer for a command invocation, or None if neither metrics nor tracing are enabled
+        """
+        trace = self.spans.current if self.spans is not None else None
+        if self.metrics is not None:
+            return self.metrics.start(command, trace)
+
+        if trace is not None:
+            return _Timing(None, self.spans.timer, trace)
+
     def _inject_to_globals(self, func=None, globals=None):
         if globals is None and func is None:
             raise ValueError("need either func or globals")
 
         if func and not globals:
+            if self._explicit_globals:
+                return
             globals = func.__globals__
+        else:
+            self._explicit_globals = True
 
         if "Init" in globals:
             return
@@ -268,6 +432,21 @@ class Bot(GroupMapping, BotBase):
 
         return func
 
+    def has_listener(self, flag):
+        """
+        returns whether anything is listening to the given event. the flag is given without the *on_* prefix
+        """
+        flag = "on_" + flag
+        if self.__listeners.get(flag):
+            return True
+
+        for node in self.__nodes.values():
+            for listener in node._listeners:
+                if listener.__flag == flag:
+                    return True
+
+        return False
+
     def remove_listener(self, func):
         if not hasattr(func, "__listen_to__"):
             raise ValueError("function is not a listener")
@@ -302,6 +481,26 @@ class Bot(GroupMapping, BotBase):
 
         return decorator
 
+    def loop(self, seconds=0, minutes=0, hours=0, jitter=0.0, count=None, name=None, autostart=True):
+        """
+        decorator that turns a function into a :class:`Loop`, run every *seconds* + *minutes* + *hours* from Tick.
+
+        Parameters
+        -----------
+        jitter: delay each run by a random amount up to this many seconds, to spread loops out over ticks
+        count: how many times to run before stopping. runs forever if None
+        name: the name of the loop, used in error reports. defaults to the function name
+        autostart: start the loop when the bot is initialized. otherwise, call :meth:`Loop.start`
+        """
+
+        def decorator(func):
+            self._inject_to_globals(func)
+            result = Loop(self, func, seconds + minutes * 60 + hours * 3600, jitter, count, name, autostart)
+            self.loops.append(result)
+            return result
+
+        return decorator
+
     def group(self, *args, **kwargs):
         """A shortcut decorator that invokes :func:`.group` and adds it to
         the internal command list via :meth:`~.GroupMapping.add_command`.
@@ -325,10 +524,14 @@ class Bot(GroupMapping, BotBase):
 
     def schedule_event(self, flag, delay=0.0, *args, **data):
         """
-        internal function to schedule events to be delayed until a later time
+        internal function to schedule events to be delayed until a later time.
+        this is safe to call from any thread.
         """
-        event = Event(self, delay, flag, *args, **data)
-        self._scheduled_events.append(event)
+        self._enqueue(Event(self, delay, flag, *args, **data))
+
+    def _enqueue(self, event):
+        with self._ingress_lock:
+            self._ingress.append(event)
 
     def dispatch(self, flag, *args, **kwargs):
         """
@@ -338,7 +541,8 @@ class Bot(GroupMapping, BotBase):
             self._inner_dispatch(flag, *args, **kwargs) # delaying tick dont work so well...
 
         else:
-            #self.debug("scheduling event on_" + flag)
+            if self.tracer.scheduler >= TraceLevel.trace:
+                self.tracer.trace("scheduler", "scheduling event on_{0}", flag)
             if kwargs.get("delay"):
                 del kwargs['delay']
 
@@ -346,24 +550,45 @@ class Bot(GroupMapping, BotBase):
 
     def _inner_dispatch(self, flag, *args, **kwargs):
         flag = "on_"+flag
-        if flag != "on_tick":
-            #self.debug("dispatching event: " + flag)
-            pass
+        if self.tracer.dispatch >= TraceLevel.debug and flag != "on_tick":
+            self.tracer.debug("dispatch", "dispatching event: {0}", flag)
 
-        if flag in self.__listeners:
-            for listener in self.__listeners[flag]:
-                self._actual_dispatch(listener, *args, **kwargs)
-
-        for node in self.__nodes.values():
-            for listener in node._listeners:
-                if listener.__flag == flag:
-                    listener(*args, **kwargs)
+        # only tasks that were already waiting are woken, not ones started by this event's own listeners
+        waiters = self.tasks.waiting.pop(flag, None) if self.tasks.waiting else None
+        try:
+            if flag in self.__listeners:
+                for listener in self.__listeners[flag]:
+                    self._actual_dispatch(listener, *args, **kwargs)
+
+            for node in self.__nodes.values():
+                for listener in node._listeners:
+                    if listener.__flag == flag:
+                        listener(*args, **kwargs)
+        finally:
+            if waiters:
+                self.tasks.notify(flag, args, waiters)
 
     def _actual_dispatch(self, func, *args, **kwargs):
+        # the bot's own listeners keep the origin of the event, so a reply is counted under the command that sent it
+        stats = self.parent_stats
+        attribute = stats is not None and getattr(func, "__self__", None) is not self
+        if attribute:
+            stats.push("listener:" + getattr(func, "__name__", "?"))
         try:
-            func(*args, **kwargs)
+            spec = getattr(func, "__off_thread__", None)
+            if spec is not None:
+                self.pool.submit(spec, func, args, kwargs)
+                return
+
+            ret = func(*args, **kwargs)
+            if isinstance(ret, types.GeneratorType):
+                # generator listeners run as tasks
+                self.tasks.create(ret, "listener:" + getattr(func, "__name__", "?"))
         except Exception as e:
             self._inner_dispatch("error", e, sys.exc_info()[2]) # give the traceback here, in case there's another error before the handler is called
+        finally:
+            if attribute:
+                stats.pop()
 
     def dispatch_command(self, data):
         msg = self.get_message(data)
@@ -371,24 +596,50 @@ class Bot(GroupMapping, BotBase):
         if not msg.valid:
             return
 
+        if self.tracer.commands >= TraceLevel.debug:
+            self.tracer.debug("commands", "dispatching {0!r} for {1}", msg.command, msg.author.name)
+
         msg.command.dispatch(msg)
     
     def get_message(self, data):
+        trace = self.spans.current if self.spans is not None else None
+        if trace is not None:
+            start = self.spans.timer()
+
         chan = self.get_channel(self._platform if not data.IsFromDiscord() else Platforms.discord)
         msg = Message(self, data.User, data.UserName, data.Message, chan, data)
+        if trace is not None:
+            trace.span("message", start, self.spans.timer())
         return msg
 
     def on_command_error(self, msg, exception, tb):
-        msg.reply("error! " + exception.message)
+        fingerprint = self.errors.fingerprint(exception, tb, msg.command.qualified_name if msg.command else None)
+        # cooldowns and bad input are the user's own mistake, so they always get a reply
+        if isinstance(exception, (CommandOnCooldown, UserInputError)) or self.errors.should_reply(fingerprint):
+            msg.reply("error! " + exception.message)
+
+        if not self.errors.record(fingerprint):
+            # this was already reported, it will be summed up in _report_errors
+            return
+
         v = traceback.format_exception(type(exception), exception, tb)
         v = "".join(v)
         logger.error(v)
         self.log(v)
 
     def on_error(self, error, tb):
+        if not self.errors.record(self.errors.fingerprint(error, tb)):
+            return
+
         v = "".join(traceback.format_exception(type(error), error, tb))
         self.log(v)
 
+    def _report_errors(self):
+        for fingerprint, repeats, total in self.errors.summaries():
+            v = self.errors.format_summary(fingerprint, repeats, total)
+            logger.error(v)
+            self.log(v)
+
     def on_message(self, data):
         self.dispatch_command(data)
 
@@ -409,7 +660,7 @@ class Bot(GroupMapping, BotBase):
         except TypeError:
             # It's possible that a generator raised this exception.  Don't
             # replace it with our own error if that's the case.
-            if isinstance(ret, collections.Iterable):
+            if isinstance(ret, Iterable):
                 raise
 
             raise TypeError(
@@ -445,10 +696,13 @@ class Bot(GroupMapping, BotBase):
                       target=target)
         if delay <= 0:
             # do not schedule the event, just run it.
-            event.dispatch()
+            if self._pool is not None and self._pool.in_worker():
+                self._pool.call_soon(event.dispatch)
+            else:
+                event.dispatch()
             return
 
-        self._scheduled_events.append(event)
+        self._enqueue(event)
 
     def parse(self, msg, content):
         """
@@ -463,18 +717,38 @@ class Bot(GroupMapping, BotBase):
         return content
 
     def _parse_and_send(self, channel, content, message, highlight=False):
+        if self._pool is not None and self._pool.in_worker():
+            # parsing, send listeners and the send itself all run on the chatbot thread
+            self._pool.call_soon(self._parse_and_send, channel, content, message, highlight)
+            return
+
+        trace = self.spans.current if self.spans is not None else None
+        if trace is not None:
+            start = self.spans.timer()
+
         try:
             parsed_message = self.parse(message, content)
         except Exception as e:
             self.dispatch("error", e, sys.exc_info()[2])
 
             parsed_message = content
+
+        if trace is not None:
+            parsed = self.spans.timer()
+            trace.span("parse", start, parsed)
+
         self._send(channel, parsed_message, highlight=highlight)
+        if trace is not None:
+            trace.span("send", parsed, self.spans.timer())
 
     def _dm_parse_and_send(self, user, content, msg, discord=False):
         if not discord and self._platform != Platforms.twitch:
             logger.warning("attempted to whisper on platform %s" % Platforms.sources[self._platform])
             raise CannotWhisperOnPlatform
+        if self._pool is not None and self._pool.in_worker():
+            self._pool.call_soon(self._dm_parse_and_send, user, content, msg, discord)
+            return
+
         try:
             processed = self.parse(msg, content)
         except Exception as e:
@@ -482,9 +756,9 @@ class Bot(GroupMapping, BotBase):
             processed = content
 
         if discord:
-            self.__parent.SendDiscordDM(user, processed)
+            self.parent.SendDiscordDM(user, processed)
         else:
-            self.__parent.SendStreamWhisper(user, processed)
+            self.parent.SendStreamWhisper(user, processed)
 
     def _send(self, channel, content, highlight=False):
         """
@@ -495,10 +769,10 @@ class Bot(GroupMapping, BotBase):
             content = "/me " + content
 
         if channel.id in Platforms.stream_services:
-            self.__parent.SendStreamMessage(content)
+            self.parent.SendStreamMessage(content)
 
         elif channel.id == Platforms.discord:
-            self.__parent.SendDiscordMessage(content)
+            self.parent.SendDiscordMessage(content)
 
     def add_command(self, command):
         """
@@ -508,6 +782,15 @@ class Bot(GroupMapping, BotBase):
         self.__commands[command.name] = command
         # do not add aliases to __commands.
 
+    def remove_command(self, name):
+        """
+        removes a command from the bot.
+        """
+        command = GroupMapping.remove_command(self, name)
+        if command is not None and self.__commands.get(name) is command:
+            del self.__commands[name]
+        return command
+
     def add_node(self, node):
         """
         wip, do not invoke this
@@ -549,45 +832,65 @@ class Bot(GroupMapping, BotBase):
 
     @property
     def streamer_name(self):
-        return str(self.__parent.GetChannelName())
+        return str(self.parent.GetChannelName())
 
     @property
     def live(self):
-        return self.__parent.IsLive()
+        return self.parent.IsLive()
     
     @property
     def live_timer(self):
         if not self.live:
             return 0
-        return round(time.mktime(datetime.datetime.now().timetuple()) - time.mktime(self._live_dt.timetuple()))
+        return round((self.clock.now() - self._live_dt).total_seconds())
+
+    @property
+    def pending_events(self):
+        """
+        the amount of scheduled events waiting to be dispatched, including ones queued from other threads
+        """
+        return len(self._scheduled_events) + len(self._ingress)
 
     @property
     def currencyname(self):
-        return self.__parent.GetCurrencyName()
+        return self.parent.GetCurrencyName()
     
     @property
     def viewers(self):
-        return self.__parent.GetViewerList() #type: list
+        return self.parent.GetViewerList() #type: list
     
     @property
     def active_viewers(self):
-        return self.__parent.GetActiveUsers()
+        return self.parent.GetActiveUsers()
     
     def get_random_viewer(self):
-        return self.__parent.GetRandomActiveUser()
+        return self.parent.GetRandomActiveUser()
     
     def log(self, *data):
-        rp = " ".join([str(x) for x in data])
-        self.parent.Log(self.__script_globals['ScriptName'], rp)
+        """
+        logs to the chatbot's log. lines are buffered, and sent to the chatbot together once per tick.
+        """
+        self._log_buffer.append(" ".join([str(x) for x in data]))
+
+    def _flush_log(self):
+        if not self._log_buffer or self.__parent is None:
+            return
+
+        buffer = self._log_buffer
+        lines = [buffer.popleft() for _ in range(len(buffer))]
+        self.parent.Log(self.__script_globals['ScriptName'], "\n".join(lines))
 
     def debug(self, *data):
         if not self._debug:
             return
 
         self.log(*data)
+
+    def _trace_sink(self, subsystem, message):
+        self.log("[{0}] {1}".format(subsystem, message))
     
     def play(self, fp, volume=100):
-        self.__parent.PlaySound(fp, round(volume/100, 1))
+        self.parent.PlaySound(fp, round(volume/100, 1))
 
     def get_channel(self, platform):
         if isinstance(platform, str):
@@ -596,21 +899,38 @@ class Bot(GroupMapping, BotBase):
         return ret
 
     def get_user(self, id):
-        return User(id, self.__parent.GetDisplayName(id), bot=self)
+        return User(id, self.parent.GetDisplayName(id), bot=self)
 
     def broadcast_ws_event(self, event_flag, headers=None, **kwargs):
-        return json.loads(self.__parent.BroadcastWSEvent(event_flag, json.dumps(kwargs), headers=headers or {}))
-
-    def api_get(self, target, headers=None):
-        v = self.__parent.GetRequest(target, headers or {})
-        v = json.loads(v)
-        ret = collections.namedtuple("response", list(v.keys()))
-        for a, b in v.items():
-            setattr(ret, a, b)
-        return ret
+        """
+        broadcasts an event to the overlays right away, and returns the parsed response.
+        for events that update often, use :attr:`ws` instead, which batches events and only sends the latest
+        value for each key once per tick.
+        """
+        return json.loads(self.parent.BroadcastWSEvent(event_flag, json.dumps(kwargs), headers=headers or {}))
+
+    def api_get(self, target, headers=None, ttl=None):
+        """
+        makes a GET request through the chatbot. responses are cached in :attr:`api_cache`, so calling this
+        repeatedly for the same url will not hit the network until the cached response expires.
+
+        Parameters
+        -----------
+        target: the url to request
+        headers: a dict of headers to send with the request
+        ttl: how long to cache the response for. defaults to the ttl set for the endpoint in :attr:`api_cache`.
+        0 will always go to the network.
+
+        Returns
+        --------
+        a :class:`Response`
+        """
+        headers = headers or {}
+        return self.api_cache.fetch(target, headers,
+                                    lambda: Response(json.loads(self.parent.GetRequest(target, headers))), ttl)
 
     def api_post(self, target, headers=None, **kwargs):
-        return json.loads(self.__parent.PostRequest(target, headers or {}, dict(kwargs)))
+        return json.loads(self.parent.PostRequest(target, headers or {}, dict(kwargs)))
     
     def mass_add_points(self, items):
         """
@@ -621,7 +941,7 @@ class Bot(GroupMapping, BotBase):
         items: a list of tuples that contain the :func:`User` and the amount
         """
         for user, amo in items:
-            self.__parent.AddPoints(user.id, user.name, amo)
+            self.parent.AddPoints(user.id, user.name, amo)
         return list()
 
     def mass_remove_points(self, items):
@@ -634,13 +954,27 @@ class Bot(GroupMapping, BotBase):
         """
         failed = []
         for user, amo in items:
-            if not self.__parent.RemovePoints(user.id, user.name, amo):
+            if not self.parent.RemovePoints(user.id, user.name, amo):
                 failed.append(user)
         return failed
 
+    @property
+    def browser(self):
+        """
+        the :class:`BrowserWindow` used for purges, vips, etc. its :meth:`~BrowserWindow.get_stats` gives the queue
+        depth and how long each action takes.
+        """
+        return self._api
+
     def purge_user(self, user):
         self._api.purge(user)
 
+    def purge_users(self, users):
+        """
+        purges many users at once. the purges are queued as one batch on the browser thread.
+        """
+        self._api.purge_many(users)
+
     def send_caster_message(self, msg):
         self._api.send_msg_as_caster(msg)
 
@@ -655,10 +989,25 @@ class Bot(GroupMapping, BotBase):
 
 
 class BrowserWindow:
+    """
+    runs actions through the chatbot's browser, on a single long-lived STA thread.
+    actions are queued, and run in the order they were submitted.
+    """
     def __init__(self, bot, startup):
         self.bot = bot
         self.startup = startup
         self.ready = False
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.stats = {}
+
+    @property
+    def queue_depth(self):
+        """
+        the amount of actions waiting to be run
+        """
+        return self._queue.qsize()
 
     def Show(self):
         self.form.Show()
@@ -675,44 +1024,114 @@ class BrowserWindow:
         self.browser = self.tcom.Browser
         self.form.Content = self.browser
 
-    def runfunc(self, func):
-        if not self.ready:
-            def coro():
-                try:
-                    self.setup()
-                except:
-                    pass
-                else:
-                    func()
+    def submit(self, name, func):
+        """
+        queues an action to be run on the browser thread.
 
-            return self.run_efsharp_thread(coro)
-        else:
-            return self.run_efsharp_thread(func)
+        Parameters
+        -----------
+        name: the name of the action, used for the stats
+        func: a callable taking no arguments
+        """
+        self._ensure_worker()
+        self._queue.put((name, func, time.time()))
+
+    def submit_many(self, name, funcs):
+        """
+        queues many actions at once, IE purging a list of users
+        """
+        self._ensure_worker()
+        now = time.time()
+        for func in funcs:
+            self._queue.put((name, func, now))
+
+    def close(self):
+        """
+        stops the browser thread once the actions already queued have run
+        """
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+
+        with self._worker_lock:
+            if self._worker is not None:
+                return
+
+            from System.Threading import Thread, ThreadStart, ApartmentState
+            thread = Thread(ThreadStart(self._work))
+            thread.IsBackground = True
+            thread.SetApartmentState(ApartmentState.STA)
+            thread.Start()
+            self._worker = thread
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            name, func, queued = item
+            started = time.time()
+            failed = False
+            try:
+                if not self.ready:
+                    self.setup()
+                func()
+            except:
+                failed = True
+                logger.debug("browser action %s failed", name, exc_info=True)
+
+            self._record(name, queued, started, time.time(), failed)
+
+    def _record(self, name, queued, started, finished, failed):
+        # count, failures, total wait, total run time, slowest run time, last run time
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0, 0.0, 0.0, 0.0, 0.0]
+
+        took = finished - started
+        stat[0] += 1
+        stat[1] += failed
+        stat[2] += started - queued
+        stat[3] += took
+        stat[4] = max(stat[4], took)
+        stat[5] = took
+
+    def get_stats(self):
+        """
+        returns a dict of action name to a dict of its count, failures, average queue wait,
+        average/max/last run time (in seconds), plus the current queue depth under ``"queue_depth"``
+        """
+        ret = {"queue_depth": self.queue_depth}
+        for name, (count, failed, wait, run, slowest, last) in list(self.stats.items()):
+            ret[name] = {"count": count, "failed": failed, "avg_wait": wait / count, "avg_run": run / count,
+                         "max_run": slowest, "last_run": last}
+        return ret
 
     def send_msg_as_caster(self, msg):
-        return self.runfunc(lambda: self.tcom.JSSendCommand(str(msg), ""))
+        return self.submit("send_msg_as_caster", lambda: self.tcom.JSSendCommand(str(msg), ""))
 
     def vip(self, user):
-        return self.runfunc(lambda: self.tcom.JSSendCommand("/vip " + user.id, ""))
+        return self.submit("vip", lambda: self.tcom.JSSendCommand("/vip " + user.id, ""))
 
     def purge(self, user):
-        return self.runfunc(lambda: self.tcom.JSPurge(user.id))
+        return self.submit("purge", lambda: self.tcom.JSPurge(user.id))
+
+    def purge_many(self, users):
+        return self.submit_many("purge", [(lambda u=u: self.tcom.JSPurge(u.id)) for u in users])
 
     def editor(self, user):
-        return self.runfunc(lambda: self.tcom.JSEditor(user.id))
+        return self.submit("editor", lambda: self.tcom.JSEditor(user.id))
 
     def regular(self, user):
-        return self.runfunc(lambda: self.tcom.JSRegular(user.id))
+        return self.submit("regular", lambda: self.tcom.JSRegular(user.id))
 
     def ban(self, user):
-        return self.runfunc(lambda: self.tcom.JSBan(user.id))
+        return self.submit("ban", lambda: self.tcom.JSBan(user.id))
 
     def timeout(self, user):
-        return self.runfunc(lambda: self.tcom.JSTimeout(user.id))
-
-    def run_efsharp_thread(self, runner):
-        from System.Threading import Thread, ThreadStart, ApartmentState
-        thread = Thread(ThreadStart(runner))
-        thread.SetApartmentState(ApartmentState.STA)
-        thread.Start()
-        return thread
+        return self.submit("timeout", lambda: self.tcom.JSTimeout(user.id))
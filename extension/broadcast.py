@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+__all__ = [
+    "WSChannel",
+]
+
+
+class WSChannel(object):
+    """
+    a buffered websocket broadcast channel, available as :attr:`Bot.ws`.
+    events sent through the channel are held until the end of the current tick, and then sent to the overlays as
+    one batched event. the batch is a json list of ``{"event": flag, "data": {...}}`` objects, in the order the
+    events were first sent.
+
+    Parameters
+    -----------
+    bot: the :class:`Bot`
+    batch_flag: the event name the batch is broadcast under
+    """
+    def __init__(self, bot, batch_flag="EXTENSION_BATCH"):
+        self._bot = bot
+        self.batch_flag = batch_flag
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def send(self, event_flag, data=None, key=None, immediate=False):
+        """
+        queues an event to be broadcast at the end of the tick.
+
+        Parameters
+        -----------
+        event_flag: the name of the event
+        data: a json serializable dict to send with the event
+        key: if given, a later event with the same flag and key will replace this one if it hasn't been sent yet,
+        so that only the latest value is sent. useful for counters and leaderboards.
+        immediate: sends the event on its own right away, instead of batching it. the parsed response is returned.
+        """
+        if immediate:
+            return self._bot.broadcast_ws_event(event_flag, **(data or {}))
+
+        with self._lock:
+            if key is None:
+                # never coalesce events without a key
+                self._counter += 1
+                key = (None, self._counter)
+
+            self._pending[(event_flag, key)] = data or {}
+
+    def discard(self, event_flag, key=None):
+        """
+        drops a queued event before it is sent. if no key is given, all the queued events with the flag are dropped.
+        """
+        with self._lock:
+            for slot in [x for x in self._pending if x[0] == event_flag and (key is None or x[1] == key)]:
+                del self._pending[slot]
+
+    def flush(self):
+        """
+        sends all the queued events as one batch. this is called by the bot at the end of every tick.
+        """
+        if not self._pending:
+            return
+
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+
+        payload = json.dumps([{"event": flag, "data": data} for (flag, _), data in pending.items()])
+        self._bot.parent.BroadcastWSEvent(self.batch_flag, payload)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+__all__ = [
+    "TTLCache",
+    "APICache",
+    "EventDeduplicator"
+]
+
+_missing = object()
+
+
+class TTLCache(object):
+    """
+    a size capped LRU mapping where every entry expires after a given amount of seconds.
+    this is not thread safe by itself, the owner is expected to lock around it if needed.
+
+    Parameters
+    -----------
+    maxsize: the maximum amount of entries to hold. the least recently used entry is evicted first.
+    ttl: the default amount of seconds an entry lives for.
+    """
+    def __init__(self, maxsize=128, ttl=60.0, timer=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key, default=None):
+        try:
+            expires, value = self._data.pop(key)
+        except KeyError:
+            return default
+
+        if expires < self._timer():
+            return default
+
+        # re-insert it so it becomes the most recently used entry
+        self._data[key] = expires, value
+        return value
+
+    def set(self, key, value, ttl=None):
+        self._data.pop(key, None)
+        self._data[key] = self._timer() + (self.ttl if ttl is None else ttl), value
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def prune(self):
+        """
+        removes all expired entries
+        """
+        now = self._timer()
+        dead = [k for k, (expires, _) in self._data.items() if expires < now]
+        for k in dead:
+            del self._data[k]
+
+
+class _Flight(object):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class APICache(object):
+    """
+    the response cache used by :meth:`Bot.api_get`.
+    responses are keyed on the url and the headers sent with the request, and identical requests that
+    are made while one is already going out will wait for that request instead of making their own.
+
+    Parameters
+    -----------
+    maxsize: the maximum amount of responses to keep.
+    ttl: the default amount of seconds a response is kept for. endpoints can be given their own ttl via :meth:`set_ttl`
+    """
+    def __init__(self, maxsize=256, ttl=30.0, timer=time.time):
+        self._cache = TTLCache(maxsize, ttl, timer)
+        self._ttls = []
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def set_ttl(self, prefix, ttl):
+        """
+        sets the ttl for every url starting with the given prefix. the longest matching prefix wins.
+        a ttl of 0 disables caching for those urls.
+
+        Parameters
+        -----------
+        prefix: the start of the url, IE ``https://api.twitch.tv/helix/streams``
+        ttl: the amount of seconds to keep responses for
+        """
+        self._ttls = [x for x in self._ttls if x[0] != prefix]
+        self._ttls.append((prefix, float(ttl)))
+        self._ttls.sort(key=lambda x: len(x[0]), reverse=True)
+
+    def ttl_for(self, url):
+        for prefix, ttl in self._ttls:
+            if url.startswith(prefix):
+                return ttl
+        return self._cache.ttl
+
+    def invalidate(self, url=None):
+        """
+        drops the cached responses for the given url, or everything if no url is given
+        """
+        with self._lock:
+            if url is None:
+                self._cache.clear()
+                return
+
+            for key in [k for k in self._cache._data if k[0] == url]:
+                self._cache.pop(key)
+
+    def fetch(self, url, headers, loader, ttl=None):
+        """
+        returns the cached response for the request, or calls *loader* to make it.
+        only responses with a 2xx status (or no status at all) are cached.
+        """
+        if ttl is None:
+            ttl = self.ttl_for(url)
+
+        key = (url, tuple(sorted((str(k).lower(), v) for k, v in headers.items())))
+        with self._lock:
+            if ttl > 0:
+                ret = self._cache.get(key, _missing)
+                if ret is not _missing:
+                    self.hits += 1
+                    return ret
+
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = ret = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            status = getattr(ret, "status", None)
+            if ttl > 0 and (status is None or 200 <= status < 300):
+                with self._lock:
+                    self._cache.set(key, ret, ttl)
+            return ret
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+
+class EventDeduplicator(object):
+    """
+    remembers recently seen events, so that events replayed by a reconnecting socket are only dispatched once.
+    events are keyed on their id, or on their content if they do not have one. keys are forgotten after *window*
+    seconds, or once *maxsize* newer keys have been seen.
+    content keys are only kept for *content_window* seconds, as two real events (IE two identical cheers) can share
+    the same content.
+
+    Parameters
+    -----------
+    maxsize: the maximum amount of keys to remember
+    window: the amount of seconds to remember an id for
+    content_window: the amount of seconds to remember an event without an id for. this should cover a reconnect
+    """
+    def __init__(self, maxsize=2048, window=900.0, timer=time.time, content_window=30.0):
+        self._seen = TTLCache(maxsize, window, timer)
+        self.content_window = content_window
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def seen(self, event_id=None, *content):
+        """
+        returns ``True`` if the event was already seen, otherwise remembers it and returns ``False``.
+
+        Parameters
+        -----------
+        event_id: the id of the event, if it has one
+        content: the fields identifying the event, used when there is no id
+        """
+        if event_id:
+            key, ttl = ("id", event_id), None
+        else:
+            key, ttl = ("content",) + content, self.content_window
+
+        with self._lock:
+            if self._seen.get(key, False):
+                self.duplicates += 1
+                return True
+
+            self._seen.set(key, True, ttl)
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import sys
+import time
+import datetime
+
+__all__ = [
+    "SystemClock",
+    "VirtualClock"
+]
+
+# the most precise timer available, for measuring how long things take rather than telling the time
+if hasattr(time, "perf_counter"):
+    perf_timer = time.perf_counter
+elif sys.platform in ("win32", "cli"):
+    # time.time only ticks every ~15ms on windows, which is longer than most Parent calls
+    perf_timer = time.clock
+else:
+    perf_timer = time.time
+
+
+class SystemClock(object):
+    """
+    the default clock of the :class:`Bot`, which reads the system time
+    """
+    virtual = False
+
+    def time(self):
+        """
+        the current time, as seconds since the epoch
+        """
+        return time.time()
+
+    def now(self):
+        """
+        the current local time, as a :class:`datetime.datetime`
+        """
+        return datetime.datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def __repr__(self):
+        return "<SystemClock>"
+
+
+class VirtualClock(SystemClock):
+    """
+    a clock that only moves when told to, for simulations and tests.
+    scheduled events, cooldowns, caches and uptime all follow it, so hours can be simulated without waiting.
+
+    Parameters
+    -----------
+    start: the time to start at, as seconds since the epoch. defaults to a fixed date, so runs are reproducible
+    """
+    virtual = True
+
+    def __init__(self, start=1577836800.0):
+        self._now = float(start)
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.datetime.fromtimestamp(self._now)
+
+    def advance(self, seconds):
+        """
+        moves the clock forward by *seconds*
+        """
+        if seconds < 0:
+            raise ValueError("the clock can't go backwards")
+        self._now += seconds
+
+    def set(self, timestamp):
+        """
+        moves the clock forward to *timestamp*. times in the past are ignored, the clock never goes backwards
+        """
+        if timestamp > self._now:
+            self._now = float(timestamp)
+
+    # sleeping on a virtual clock just moves it forward
+    sleep = advance
+
+    def __repr__(self):
+        return "<VirtualClock at {0}>".format(self.now().isoformat())
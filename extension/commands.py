@@ -25,8 +25,9 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 import sys
+import types
+import functools
 import inspect
-import calendar
 import traceback
 from collections import OrderedDict
 
@@ -34,6 +35,7 @@ from .errors import *
 from .cooldowns import *
 from . import errors
 from . import converters
+from .metrics import _noop
 from .abc import RestOfInput, BotBase, Union, Optional, User
 
 __all__ = [
@@ -53,6 +55,9 @@ def p():
 _function_type = type(p)
 del p
 
+# getargspec was removed in python 3.11
+_getargspec = getattr(inspect, "getfullargspec", None) or inspect.getargspec
+
 
 class _Base:
     pass
@@ -358,7 +363,7 @@ class Command(_Base):
 
         # unfortunately, the inspect module does not have the `Signature` API in python 2. there are also
         # no typehints as specified by PEP 484 and PEP 525 in python 2. this leaves us with defaults!
-        args = inspect.getargspec(function)
+        args = _getargspec(function)
         index = 0
 
         for no, arg in enumerate(args.args):
@@ -463,6 +468,7 @@ class Command(_Base):
             if msg.view.eof:
                 if type(wanted_type) is type(Optional):
                     kwargs[name] = None
+                    continue
                 else:
                     raise MissingArguments("Missing Arguments for call to " + self.qualified_name, name)
 
@@ -476,16 +482,22 @@ class Command(_Base):
                     kwargs[name] = msg.view.read_rest()
                     break
 
+                # get_quoted_word moves the view one character at a time, so undo() can't rewind a whole word
+                start = msg.view.index
                 try:
                     transformed = self.do_transformation(msg, wanted_type.type, index)
                     kwargs[name] = transformed
                 except:
-                    msg.view.undo()
+                    msg.view.index = start
                     kwargs[name] = None
                     continue
 
+                index += 1
+                continue
+
             if type(wanted_type) is type(Union):
                 transformed = None
+                start = msg.view.index
                 for attempt in wanted_type.types:
                     try:
                         transformed = self.do_transformation(msg, attempt, index)
@@ -493,13 +505,16 @@ class Command(_Base):
                         break
 
                     except:
-                        msg.view.undo()
+                        msg.view.index = start
                         continue
 
                 if transformed is None:
                     raise BadUnionArgument(wanted_type, "Failed to convert '{0}' to any of {1}".format(
                         msg.view.get_quoted_word(), ", ".join(str(x) for x in wanted_type.types)))
 
+                index += 1
+                continue
+
             if transform:
                 transformed = self.do_transformation(msg, wanted_type, index)
                 kwargs[name] = transformed
@@ -518,16 +533,27 @@ class Command(_Base):
         self._set_callback(self._delayed_callback)
         self.namer(bot)
 
-    def namer(self, bot):
-        if self._original_name.startswith("settings::"):
-            name = self._original_name.replace("settings::", "", 1)
-            if hasattr(bot.settings, name):
-                self.name = getattr(bot.settings, name)
-                if bot.prefix in self.name:
-                    self.name = self.name.replace(bot.prefix, "", 1)
-            else:
-                raise ValueError("Invalid setting: {0} when trying to fetch command name from settings file. "
-                                 "The setting: {0} does not exist. command: {1}".format(name, self._original_name))
+    def namer(self, bot, changed=None):
+        """
+        names the command after its setting, if it was named with ``settings::``.
+        if a dict of changed settings is given, the command is only renamed if its setting is in it.
+        returns whether the command was renamed.
+        """
+        if not self._original_name.startswith("settings::"):
+            return False
+
+        name = self._original_name.replace("settings::", "", 1)
+        if changed is not None and name not in changed:
+            return False
+
+        if hasattr(bot.settings, name):
+            self.name = getattr(bot.settings, name)
+            if bot.prefix in self.name:
+                self.name = self.name.replace(bot.prefix, "", 1)
+            return True
+        else:
+            raise ValueError("Invalid setting: {0} when trying to fetch command name from settings file. "
+                             "The setting: {0} does not exist. command: {1}".format(name, self._original_name))
 
     def dispatch(self, message):
         """
@@ -543,24 +569,40 @@ class Command(_Base):
         c) otherwise, the error will be sent to :meth:`Bot.error`
 
         """
+        stats = message.bot.parent_stats
+        if stats is not None:
+            stats.push("command:" + self.qualified_name)
         try:
             self._do_dispatch(message)
         except errors.CommandError as e:
+            if message.bot.metrics is not None:
+                message.bot.metrics.reject(self, e)
             message.bot.dispatch("command_error", message, e, sys.exc_info()[2])
 
         except Exception as e:
+            if message.bot.metrics is not None:
+                message.bot.metrics.reject(self, e)
             v = ExceptionCaught("Command {0}".format(self.qualified_name), e)
             message.bot.dispatch("command_error", message, v, sys.exc_info()[2])
 
+        finally:
+            if stats is not None:
+                stats.pop()
+
     def _do_dispatch(self, msg, run_checks=True):
+        timing = msg.bot._start_timing(self)
+        mark = timing or _noop
         if run_checks:
             # run the checks first
             self.can_run(msg)
+            mark("checks")
             # checks succeeded, now check the cooldown(s)
             self._do_cooldowns(msg)
+            mark("cooldowns")
             # cooldown(s) are ok, now get the parameters
 
         self.do_parameters(msg, True)
+        mark("parsing")
 
         if self.pre_hook is not None:
             try:
@@ -568,27 +610,44 @@ class Command(_Base):
             except:
                 # ignore any exceptions that come from the pre/post hooks
                 pass
-
-        # run the command function
-        self.callback(*msg.args, **msg.kwargs)
+            mark("pre_hook")
+
+        # run the command function. off-thread commands go to the worker pool, generator commands run as tasks
+        spec = getattr(self._callback, "__off_thread__", None)
+        if spec is not None:
+            msg.bot.pool.submit(spec, self.callback, msg.args, msg.kwargs, functools.partial(msg.reply, spec.busy_message),
+                                functools.partial(self._task_error, msg))
+            ret = None
+        else:
+            ret = self.callback(*msg.args, **msg.kwargs)
+        if isinstance(ret, types.GeneratorType):
+            msg.bot.tasks.create(ret, "command:" + self.qualified_name, functools.partial(self._task_error, msg))
+        mark("callback")
 
         if self.post_hook is not None:
             try:
                 self.post_hook(msg)
             except:
                 pass
+            mark("post_hook")
+
+        if timing is not None:
+            timing.finish()
 
     def _do_cooldowns(self, msg):
         for cooler in self._coolers:
             if cooler.valid:
-                current = msg.timestamp.replace(
-                    tzinfo=None)
-                current = calendar.timegm(current.timetuple())
+                current = msg.bot.clock.time()
                 bucket = cooler.get_bucket(msg, current)
                 retry_after = bucket.update_rate_limit(current)
                 if retry_after:
                     raise bucket.error(bucket, retry_after)
 
+    def _task_error(self, msg, exc, tb):
+        if not isinstance(exc, errors.CommandError):
+            exc = ExceptionCaught("Command {0}".format(self.qualified_name), exc)
+        msg.bot.dispatch("command_error", msg, exc, tb)
+
     def __repr__(self):
         return "<Command {0} at {1} node: {2}>".format(self.qualified_name, hex(id(self)), self.node)
 
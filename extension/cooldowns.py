@@ -57,7 +57,7 @@ class Cooldown:
             self.error = CommandOnCooldown
 
     def get_tokens(self, current=None):
-        if not current:
+        if current is None:
             current = time.time()
 
         tokens = self._tokens
@@ -67,7 +67,8 @@ class Cooldown:
         return tokens
 
     def update_rate_limit(self, current=None):
-        current = current or time.time()
+        if current is None:
+            current = time.time()
         self._last = current
 
         self._tokens = self.get_tokens(current)
@@ -127,7 +128,8 @@ class CooldownMapping:
         # we want to delete all cache objects that haven't been used
         # in a cooldown window. e.g. if we have a  command that has a
         # cooldown of 60s and it has not been used in 60s then that key should be deleted
-        current = current or time.time()
+        if current is None:
+            current = time.time()
         dead_keys = [k for k, v in self._cache.items() if current > v._last + v.per]
         for k in dead_keys:
             del self._cache[k]
@@ -1,4 +1,6 @@
+import os
 import sys
+import time
 
 from .node import Node
 from .commands import group
@@ -6,11 +8,93 @@ from .checks import check_caster
 from .abc import RestOfInput, Optional, User
 from .view import StringView
 from .errors import *
+from .clock import perf_timer as _timer
+
+
+
+class Profiler(object):
+    """
+    a deterministic profiler built on :func:`sys.setprofile`, used by ``!dev profile``.
+    it only profiles the thread it was started on (the chatbot thread), and stops itself after *duration* seconds.
+    time is aggregated per function as ``[calls, total time, own time]``.
+    """
+    def __init__(self, timer=_timer):
+        self.timer = timer
+        self.stats = {}
+        self.running = False
+        self.started = None
+        self.stopped = None
+        self._deadline = None
+        self._stack = []
+
+    def start(self, duration=30.0):
+        self.stats = {}
+        self._stack = []
+        self.started = self.timer()
+        self.stopped = None
+        self._deadline = self.started + duration
+        sys.setprofile(self._profile)
+        self.running = True
+
+    def stop(self):
+        if not self.running:
+            return
+
+        sys.setprofile(None)
+        self.running = False
+        self.stopped = self.timer()
+
+    def _profile(self, frame, event, arg):
+        now = self.timer()
+        if event == "call":
+            code = frame.f_code
+            self._stack.append([(code.co_filename, code.co_firstlineno, code.co_name), now, 0.0])
+
+        elif event == "return" and self._stack:
+            key, start, children = self._stack.pop()
+            elapsed = now - start
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = [0, 0.0, 0.0]
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += elapsed - children
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+        if now >= self._deadline:
+            self.stop()
+
+    def top(self, amount=10, by=2):
+        """
+        returns the *amount* functions with the most own time (or total time, with ``by=1``),
+        as ``(filename, line, name, calls, total, own)`` tuples
+        """
+        ranked = sorted(self.stats.items(), key=lambda x: x[1][by], reverse=True)[:amount]
+        return [key + tuple(stat) for key, stat in ranked]
+
+    def report(self, amount=50):
+        """
+        returns the profile as a table
+        """
+        lines = ["profiled for {0:.2f}s".format((self.stopped or self.timer()) - self.started),
+                 "{0:>10} {1:>12} {2:>12}  {3}".format("calls", "total (ms)", "own (ms)", "function")]
+        for filename, line, name, calls, total, own in self.top(amount):
+            lines.append("{0:>10} {1:>12.3f} {2:>12.3f}  {3} ({4}:{5})".format(
+                calls, total * 1000, own * 1000, name, os.path.basename(filename), line))
+        return "\n".join(lines)
+
+    def write_report(self, path, amount=200):
+        with open(path, "w") as f:
+            f.write(self.report(amount))
+            f.write("\n")
+
 
 class Debug(Node):
     def __init__(self, bot):
         Node.__init__(self)
         self.bot = bot
+        self.profiler = Profiler()
 
     @group()
     @check_caster()
@@ -48,3 +132,103 @@ class Debug(Node):
         except Exception as e:
             v = ExceptionCaught("Command {0}".format(cmd.qualified_name), e)
             msg.bot.dispatch("command_error", v, sys.exc_info()[2])
+
+    @dev.command()
+    @check_caster()
+    def trace(self, msg, subsystem=str, level=str):
+        """
+        sets the trace level of a subsystem (scheduler, dispatch, commands, events or all) to off, info, debug or trace
+        """
+        try:
+            self.bot.tracer.set_level(subsystem, level)
+        except (KeyError, ValueError):
+            return msg.reply("usage: trace <{0}|all> <off|info|debug|trace>".format("|".join(self.bot.tracer.subsystems)))
+
+        msg.reply("{0} tracing set to {1}".format(subsystem, level))
+
+    @dev.group()
+    @check_caster()
+    def profile(self, msg):
+        msg.reply("usage: profile <start [seconds]|stop|top [amount]>")
+
+    @profile.command()
+    @check_caster()
+    def start(self, msg, seconds=Optional[float]):
+        """
+        starts the profiler for the given amount of seconds (default 30, at most 300)
+        """
+        if self.profiler.running:
+            return msg.reply("the profiler is already running")
+
+        seconds = min(seconds or 30.0, 300.0)
+        try:
+            self.profiler.start(seconds)
+        except NotImplementedError:
+            return msg.reply("profiling is not supported by this interpreter")
+
+        msg.reply("profiling for {0:g} seconds".format(seconds))
+
+    @profile.command()
+    @check_caster()
+    def stop(self, msg):
+        """
+        stops the profiler and writes the report
+        """
+        self.profiler.stop()
+        if self.profiler.started is None:
+            return msg.reply("the profiler has not been started")
+
+        path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                            "profile-{0}.txt".format(time.strftime("%Y%m%d-%H%M%S")))
+        self.profiler.write_report(path)
+        msg.reply("profile written to {0}".format(os.path.basename(path)))
+
+    @profile.command()
+    @check_caster()
+    def top(self, msg, amount=Optional[int]):
+        """
+        replies with the functions that took the most time
+        """
+        entries = self.profiler.top(min(amount or 3, 5))
+        if not entries:
+            return msg.reply("no profile data")
+
+        msg.reply(" | ".join("{0} ({1}:{2}) {3:.1f}ms/{4} calls".format(name, os.path.basename(filename), line,
+                                                                      own * 1000, calls)
+                             for filename, line, name, calls, total, own in entries))
+
+    @dev.command(name="parent-stats")
+    @check_caster()
+    def parent_stats(self, msg, action=Optional[str]):
+        """
+        replies with the commands, listeners and events that spent the most time in Parent calls.
+        ``parent-stats reset`` clears the counts
+        """
+        stats = self.bot.parent_stats
+        if stats is None:
+            return msg.reply("parent call accounting is off, create the bot with enable_parent_stats=True")
+
+        if action == "reset":
+            stats.reset()
+            return msg.reply("parent call counts cleared")
+
+        entries = stats.top(min(int(action) if action and action.isdigit() else 3, 5))
+        if not entries:
+            return msg.reply("no parent calls recorded")
+
+        msg.reply("{0} calls, {1:.2f}ms | ".format(stats.calls(), stats.time() * 1000) +
+                  " | ".join("{0} {1} {2}x {3:.2f}ms".format(origin, method, calls, total * 1000)
+                             for origin, method, calls, total in entries))
+
+    @dev.command()
+    @check_caster()
+    def loops(self, msg):
+        """
+        replies with each loop's interval, run count, skipped runs and average run time
+        """
+        if not self.bot.loops:
+            return msg.reply("there are no loops")
+
+        msg.reply(" | ".join("{0} every {1}s {2}: {3} runs, {4} missed, {5:.2f}ms avg".format(
+            loop.name, loop.interval, "running" if loop.running else "stopped", loop.iterations, loop.missed,
+            loop.durations.mean * 1000) for loop in self.bot.loops))
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import os
+import logging
+
+try:
+    import clr
+except ImportError:
+    # not running inside the chatbot (IronPython), so there's no .NET to bind to
+    clr = None
+
+__all__ = (
+    "available",
+    "add_reference",
+    "add_bin_reference",
+    "require",
+)
+
+logger = logging.getLogger(__name__)
+bindir = os.path.join(os.path.dirname(__file__), "bin")
+_loaded = set()
+
+# the assemblies each optional feature needs. they are only loaded when the feature is first used,
+# as loading them slows down the chatbot's startup and every script reload.
+features = {
+    "events": ("StreamlabsEventReceiver.dll",),
+    "pubsub": ("TwitchLib.PubSub.dll",),
+}
+
+
+def available():
+    """
+    whether .NET assemblies can be loaded, IE if we are running inside the chatbot
+    """
+    return clr is not None
+
+
+def add_reference(name):
+    """
+    adds a reference to a .NET assembly by name. returns whether the assembly is available
+    """
+    if clr is None:
+        return False
+
+    if name not in _loaded:
+        clr.AddReference(name)
+        _loaded.add(name)
+    return True
+
+
+def add_bin_reference(filename):
+    """
+    adds a reference to one of the assemblies shipped in the extension's bin folder.
+    returns whether the assembly is available
+    """
+    if clr is None:
+        return False
+
+    if filename not in _loaded:
+        clr.AddReferenceToFileAndPath(os.path.join(bindir, filename))
+        _loaded.add(filename)
+    return True
+
+
+def require(feature):
+    """
+    loads the assemblies needed by an optional feature (see :data:`features`), if they aren't loaded yet.
+    returns whether they are available
+    """
+    if clr is None:
+        return False
+
+    # the bin folder assemblies were always loaded alongside IronPython.Modules, so keep that order
+    add_reference("IronPython.Modules.dll")
+    for filename in features[feature]:
+        add_bin_reference(filename)
+    return True
@@ -22,59 +22,327 @@ AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
-
-this is not operational yet.
 """
 
 import os
-import io
 import codecs
 import time
+import threading
+import weakref
+from collections import deque
 import traceback as _traceback
 
+class TraceLevel:
+    off = 0
+    info = 1
+    debug = 2
+    trace = 3
+    names = {"off": 0, "info": 1, "debug": 2, "trace": 3}
+
+
+class Tracer(object):
+    """
+    debug logging with a level per subsystem, available as :attr:`Bot.tracer`.
+    the message is only formatted once the level is known to be enabled, so disabled tracing costs one comparison.
+    the level of each subsystem is a plain attribute, so hot paths can check it before calling anything, IE
+    ``if bot.tracer.scheduler >= TraceLevel.debug:``
+
+    Parameters
+    -----------
+    sink: a callable taking the subsystem and the formatted message
+    level: the starting level for every subsystem
+    """
+    subsystems = ("scheduler", "dispatch", "commands", "events")
+
+    def __init__(self, sink, level=TraceLevel.off):
+        self._sink = sink
+        for subsystem in self.subsystems:
+            setattr(self, subsystem, level)
+
+    def set_level(self, subsystem, level):
+        """
+        sets the level of a subsystem, or of every subsystem if *subsystem* is ``"all"``.
+        the level can be a :class:`TraceLevel` value or its name.
+        """
+        if not isinstance(level, int):
+            level = TraceLevel.names[level.lower()]
+
+        if subsystem == "all":
+            for name in self.subsystems:
+                setattr(self, name, level)
+            return
+
+        if subsystem not in self.subsystems:
+            raise ValueError("unknown subsystem: {0}".format(subsystem))
+        setattr(self, subsystem, level)
+
+    def enabled(self, subsystem, level=TraceLevel.debug):
+        return getattr(self, subsystem, TraceLevel.off) >= level
+
+    def log(self, subsystem, level, message, *args):
+        """
+        logs *message*, formatted with *args* via :meth:`str.format`, if *level* is enabled for the subsystem
+        """
+        if getattr(self, subsystem, TraceLevel.off) < level:
+            return
+
+        self._sink(subsystem, message.format(*args) if args else message)
+
+    def info(self, subsystem, message, *args):
+        self.log(subsystem, TraceLevel.info, message, *args)
+
+    def debug(self, subsystem, message, *args):
+        self.log(subsystem, TraceLevel.debug, message, *args)
+
+    def trace(self, subsystem, message, *args):
+        self.log(subsystem, TraceLevel.trace, message, *args)
+
+
+class ErrorAggregator(object):
+    """
+    keeps repeating errors from flooding the logs and chat, available as :attr:`Bot.errors`.
+    errors are fingerprinted by their type, the command (or other origin) they came from, and the frame they were
+    raised in. the first occurrence is reported in full, repeats within *window* seconds are only counted,
+    and summed up in one line once the window is over.
+
+    Parameters
+    -----------
+    window: the amount of seconds repeats are counted for before a summary is emitted
+    reply_per: the least amount of seconds between two chat replies for the same error
+    """
+    def __init__(self, window=60.0, reply_per=15.0, timer=time.time):
+        self.window = window
+        self.reply_per = reply_per
+        self._timer = timer
+        self._seen = {}
+        self._replied = {}
+
+    def fingerprint(self, exception, tb, origin=None):
+        filename = lineno = None
+        while tb is not None:
+            filename, lineno = tb.tb_frame.f_code.co_filename, tb.tb_lineno
+            tb = tb.tb_next
+
+        # ExceptionCaught wraps the actual exception
+        exception = getattr(exception, "original", exception)
+        return type(exception).__name__, origin, filename, lineno
+
+    def record(self, fingerprint):
+        """
+        counts an occurrence of an error. returns ``True`` if it should be reported in full
+        """
+        entry = self._seen.get(fingerprint)
+        if entry is None:
+            # window start, repeats in the window, total
+            self._seen[fingerprint] = [self._timer(), 0, 1]
+            return True
+
+        entry[1] += 1
+        entry[2] += 1
+        return False
+
+    def should_reply(self, fingerprint):
+        """
+        returns whether a chat reply for this error is allowed right now
+        """
+        now = self._timer()
+        last = self._replied.get(fingerprint)
+        if last is not None and now - last < self.reply_per:
+            return False
+
+        self._replied[fingerprint] = now
+        return True
+
+    def summaries(self):
+        """
+        returns a list of ``(fingerprint, repeats, total)`` for the errors whose window is over and that repeated in it.
+        errors that didn't repeat are forgotten, so their next occurrence is reported in full again.
+        """
+        if not self._seen:
+            return []
+
+        now = self._timer()
+        ret = []
+        for fingerprint, entry in list(self._seen.items()):
+            if now - entry[0] < self.window:
+                continue
+
+            if entry[1]:
+                ret.append((fingerprint, entry[1], entry[2]))
+                entry[0] = now
+                entry[1] = 0
+            else:
+                del self._seen[fingerprint]
+                self._replied.pop(fingerprint, None)
+
+        return ret
+
+    def format_summary(self, fingerprint, repeats, total):
+        name, origin, filename, lineno = fingerprint
+        return "{0} in {1} ({2}:{3}) repeated {4} times in the last {5} seconds ({6} total)".format(
+            name, origin or "a listener", filename, lineno, repeats, int(self.window), total)
+
+
 class Logger(object):
-    def __init__(self, file=None):
+    """
+    a buffered file logger. logging a line only appends it to an in-memory buffer,
+    which is formatted and written out by a background thread once it holds *max_records* lines,
+    or its oldest line is *max_age* seconds old. the file is rotated once it grows past *max_bytes*.
+
+    Parameters
+    -----------
+    file: the path of the log file, or an open file object. defaults to BotLogs.log next to the extension
+    max_records: the amount of buffered lines that triggers a flush
+    max_age: the most seconds a line stays in the buffer
+    max_bytes: the size the file is rotated at. 0 disables rotation
+    backups: the amount of rotated files to keep
+    background: whether to flush from a background thread. if False, call :meth:`tick` regularly instead
+
+    the background thread stops when the logger is closed or garbage collected. call :meth:`close` when unloading
+    to flush the last lines right away.
+    """
+    def __init__(self, file=None, max_records=256, max_age=2.0, max_bytes=5 * 1024 * 1024, backups=3,
+                 background=True):
+        self.fp = None
         if not file:
-            fp = os.path.join(os.path.dirname(os.path.dirname(__file__)), "BotLogs.log")
-            self.io = codecs.open(self.fp, mode="a", encoding="UTF-8")
+            file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "BotLogs.log")
+
+        if isinstance(file, str):
+            self.fp = file
+            self.io = codecs.open(file, mode="a", encoding="UTF-8")
         else:
-            if isinstance(file, str):
-                self.io = codecs.open(file, mode="a", encoding="UTF-8")
-            elif isinstance(file, io.IOBase):
-                self.io = file
-    
+            self.io = file
+
+        self.max_records = max_records
+        self.max_age = max_age
+        self.max_bytes = max_bytes if self.fp else 0
+        self.backups = backups
+        self._buffer = deque()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._last_second = None
+        self._last_ctime = ""
+        self._thread = None
+        if background:
+            # the thread only holds a weak reference, so the logger can still be garbage collected (and closed)
+            self._thread = threading.Thread(target=self._run, args=(weakref.ref(self), self._wake, max_age),
+                                            name="extension-logger")
+            self._thread.daemon = True
+            self._thread.start()
+
     def __del__(self):
+        self.close()
+
+    def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wake.set()
+        self.flush()
         self.io.close()
 
+    @staticmethod
+    def _run(ref, wake, max_age):
+        while True:
+            wake.wait(max_age)
+            wake.clear()
+            self = ref()
+            if self is None or self._closed:
+                return
+
+            self.flush()
+            del self
+
     def emit(self, msg):
         if not isinstance(msg, str):
             raise ValueError("msg must be str")
-        self.io.write(msg)
+        self._push(None, None, msg)
+
+    def _push(self, level, module, msg):
+        buffer = self._buffer
+        buffer.append((time.time(), level, module, msg))
+        if len(buffer) >= self.max_records:
+            self._wake.set()
+
+    def tick(self):
+        """
+        flushes the buffer if it is full, or its oldest line is too old. only needed when not flushing in the background
+        """
+        buffer = self._buffer
+        if buffer and (len(buffer) >= self.max_records or time.time() - buffer[0][0] >= self.max_age):
+            self.flush()
+
+    def _ctime(self, when):
+        second = int(when)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_ctime = time.ctime(second)
+        return self._last_ctime
+
+    def flush(self):
+        with self._flush_lock:
+            if not self._buffer:
+                return
+
+            buffer = self._buffer
+            lines = []
+            for _ in range(len(buffer)):
+                when, level, module, msg = buffer.popleft()
+                if level is None:
+                    lines.append(msg)
+                elif level == "TRACEBACK":
+                    lines.append("TRACEBACK at {0} in module {1}:\n{2}\n".format(self._ctime(when), module, msg))
+                else:
+                    lines.append("{0}:{1}:{2}:{3}\n".format(self._ctime(when), level, module, msg))
+
+            self.io.write("".join(lines))
+            self.io.flush()
+            if self.max_bytes:
+                self._maybe_rotate()
+
+    def _maybe_rotate(self):
+        if os.path.getsize(self.fp) < self.max_bytes:
+            return
+
+        self.io.close()
+        for index in range(self.backups - 1, 0, -1):
+            src = "{0}.{1}".format(self.fp, index)
+            if os.path.exists(src):
+                dst = "{0}.{1}".format(self.fp, index + 1)
+                if os.path.exists(dst):
+                    os.remove(dst)
+                os.rename(src, dst)
+
+        if self.backups:
+            dst = self.fp + ".1"
+            if os.path.exists(dst):
+                os.remove(dst)
+            os.rename(self.fp, dst)
+        else:
+            os.remove(self.fp)
+
+        self.io = codecs.open(self.fp, mode="a", encoding="UTF-8")
 
     def info(self, msg, module="YourScript"):
-        msg = "{time}:INFO:{module}:{msg}".format(time=time.ctime(time.time()), module=module, msg=msg)
-        self.emit(msg)
+        self._push("INFO", module, msg)
 
     def debug(self, msg, module="YourScript"):
-        msg = "{time}:DEBUG:{module}:{msg}".format(time=time.ctime(time.time()), module=module, msg=msg)
-        self.emit(msg)
+        self._push("DEBUG", module, msg)
 
     def critical(self, msg, module="YourScript"):
-        msg = "{time}:CRITICAL:{module}:{msg}".format(time=time.ctime(time.time()), module=module, msg=msg)
-        self.emit(msg)
+        self._push("CRITICAL", module, msg)
 
     def error(self, msg, module="YourScript"):
-        msg = "{time}:ERROR:{module}:{msg}".format(time=time.ctime(time.time()), module=module, msg=msg)
-        self.emit(msg)
+        self._push("ERROR", module, msg)
 
     def exception(self, msg, module="YourScript"):
-        msg = "{time}:EXCEPTION:{module}:{msg}".format(time=time.ctime(time.time()), module=module, msg=msg)
-        self.emit(msg)
+        self._push("EXCEPTION", module, msg)
 
     def traceback(self, exception=None, tb=None, module="YourScript"):
         if exception and tb:
-            formatted = _traceback.format_exception(type(exception), exception, tb)
+            formatted = "".join(_traceback.format_exception(type(exception), exception, tb))
         else:
             formatted = _traceback.format_exc()
-        msg = "TRACEBACK at {time} in module {module}:\n{msg}".format(time=time.ctime(time.time()), module=module, msg=formatted)
-        self.emit(msg)
+        self._push("TRACEBACK", module, formatted)
@@ -49,7 +49,9 @@ __all__ = [
     "CommandExists",
     "TreeNotFound",
     "EventNotFound",
-    "ExceptionCaught"
+    "ExceptionCaught",
+    "TaskCancelled",
+    "TaskTimeout"
 ]
 
 # ideally all errors will be subclasses of this exception, and even more ideally, CommandError.
@@ -88,7 +90,7 @@ class ConversionError(ConverterError):
         self.converter = converter
         self.original = original
         if not msg:
-            msg = self.original.message
+            msg = getattr(self.original, "message", str(self.original))
         UserInputError.__init__(self, msg)
 
 
@@ -122,7 +124,7 @@ class NoCommandFound(CommandError):
 class ExceptionCaught(CommandError):
     def __init__(self, eventtype, original):
         self.original = original
-        self.original_msg = original.args[0]
+        self.original_msg = original.args[0] if original.args else ""
         CommandError.__init__(self, "Exception Caught while running "+eventtype+". original: "+repr(original))
 
 class CommandOnCooldown(CommandError):
@@ -146,6 +148,12 @@ class EventNotFound(BotException):
         msg = "The Event '{}' has no Event Attached".format(name)
         BotException.__init__(self, msg)
 
+class TaskCancelled(BotException):
+    message = "The task was cancelled"
+
+class TaskTimeout(BotException):
+    message = "Timed out waiting for the event"
+
 class CommandExists(Error):
     pass
 
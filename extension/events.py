@@ -25,16 +25,31 @@ DEALINGS IN THE SOFTWARE.
 
 Thanks to Ocgineer for his EventReciever.dll and boilerplate
 """
-import StreamlabsEventReceiver
+import threading
 import logging
 
+from .abc import PartialUser
+from . import dotnet
+from .errorhandler import TraceLevel
+
 logger = logging.getLogger(__name__)
 
 class EventsNode:
     def __init__(self, bot):
         self._bot = bot
+        self.receiver = None
+        self._batches = {}
+        self._batch_lock = threading.Lock()
 
     def on_init(self):
+        self.receiver = None
+        try:
+            dotnet.require("events")
+            import StreamlabsEventReceiver
+        except ImportError:
+            logger.debug("StreamlabsEventReceiver is not available, streamlabs events are disabled")
+            return
+
         self.receiver = StreamlabsEventReceiver.StreamlabsEventClient()
         self.receiver.StreamlabsSocketConnected += self.on_event_connect
         self.receiver.StreamlabsSocketDisconnected += self.on_event_disconnect
@@ -47,7 +62,15 @@ class EventsNode:
             self.receiver.Disconnect()
             self.receiver = None
 
-    def on_reload_settings(self):
+    def on_reload_settings(self, changed=None):
+        if self.receiver is None:
+            return
+
+        token = self._bot.settings.StreamlabsEventToken
+        if changed is not None and "StreamlabsEventToken" not in changed and (self.receiver.IsConnected or not token):
+            # the token didn't change, so there's no need to reconnect
+            return
+
         if self.receiver.IsConnected:
             self.receiver.Disconnect()
 
@@ -64,49 +87,93 @@ class EventsNode:
         logger.debug("Streamlabs event receiver disconnected")
         self._bot.dispatch("event_disconnect")
 
+    def _add(self, flag, *entry):
+        """
+        dispatches the per-entry event, if anything listens to it, and adds the entry to the
+        batch that is dispatched as *flag*_batch on the next tick.
+        """
+        if self._bot.has_listener(flag):
+            self._bot.dispatch(flag, *entry)
+
+        if not self._bot.has_listener(flag + "_batch"):
+            return
+
+        with self._batch_lock:
+            batch = self._batches.get(flag)
+            if batch is None:
+                batch = self._batches[flag] = []
+            batch.append(entry[0] if len(entry) == 1 else entry)
+
+    def flush(self):
+        """
+        dispatches the batched events collected since the last tick. called by the bot every tick.
+        """
+        if not self._batches:
+            return
+
+        with self._batch_lock:
+            batches, self._batches = self._batches, {}
+
+        for flag, entries in batches.items():
+            self._bot.dispatch(flag + "_batch", entries)
+
+    def _is_duplicate(self, evntdata, message):
+        return self._bot.event_dedup.seen(
+            getattr(message, "Id", None), evntdata.For, evntdata.Type, message.Name, getattr(message, "Amount", None),
+            getattr(message, "Months", None), getattr(message, "Gifter", None), getattr(message, "Message", None))
+
     def on_event_receive(self, sender, args):
         # Just grab the all data in from the event
         evntdata = args.Data
+        if self._bot.tracer.events >= TraceLevel.debug:
+            self._bot.tracer.debug("events", "received {0} event for {1}", getattr(evntdata, "Type", None),
+                                   getattr(evntdata, "For", None))
+        if not evntdata:
+            self._bot.dispatch("event_receive", sender, evntdata)
+            return
+
+        # the socket can replay events when it reconnects, drop anything we have already seen
+        received = list(getattr(evntdata, "Message", None) or [])
+        messages = [m for m in received if not self._is_duplicate(evntdata, m)]
+        if received and not messages:
+            return
+
+        # users are looked up lazily, and only once per name in a batch
+        users = {}
+        def user(name):
+            if name not in users:
+                users[name] = PartialUser(self._bot, name)
+            return users[name]
 
         # Check if it contains data and for what streaming service it is
-        if evntdata and evntdata.For == "twitch_account":
+        if evntdata.For == "twitch_account":
 
             # This is an Twitch follow event
             if evntdata.Type == "follow":
                 # Events can come in bulk so it is in a list, iterate over it.
-                for message in evntdata.Message:
-                    user = self._bot.get_user(message.Name)
-                    self._bot.dispatch("follow", user)
+                for message in messages:
+                    self._add("follow", user(message.Name))
 
             # This is a Twitch cheer event
             elif evntdata.Type == "bits":
-                for message in evntdata.Message:
-                    user = self._bot.get_user(message.Name)
-                    self._bot.dispatch("cheer", user, message.Amount, message.Message)
+                for message in messages:
+                    self._add("cheer", user(message.Name), message.Amount, message.Message)
 
             # This is a Twitch subscription event
             elif evntdata.Type == "subscription":
-                for message in evntdata.Message:
+                for message in messages:
                     if message.Gifter:
-                        user = self._bot.get_user(message.Name)
-                        gifter = self._bot.get_user(message.Gifter)
-                        self._bot.dispatch("gift_sub", user, gifter)
+                        self._add("gift_sub", user(message.Name), user(message.Gifter))
                     elif message.StreakMonths:  # Is a nullable int in .NET can check if it is not None
-                        user = self._bot.get_user(message.Name)
-                        self._bot.dispatch("streak_sub", user, message.Months, message.StreakMonths)
+                        self._add("streak_sub", user(message.Name), message.Months, message.StreakMonths)
                     elif message.Months > 1:  # Reliable way to to detect resub, as SubType is can vary with testing/real but also can contain subgift value
-                        user = self._bot.get_user(message.Name)
-                        tier = message.SubPlan
-                        self._bot.dispatch("resub", user, message.Months, tier)
+                        self._add("resub", user(message.Name), message.Months, message.SubPlan)
                     else:
-                        user = self._bot.get_user(message.Name)
-                        tier = message.SubPlan
-                        self._bot.dispatch("sub", user, tier)
+                        self._add("sub", user(message.Name), message.SubPlan)
 
-        elif evntdata and evntdata.For == "streamlabs":
+        elif evntdata.For == "streamlabs":
             # This is a streamlabs donation event
             if evntdata.Type == "donation":
-                for message in evntdata.Message:
-                    user = self._bot.get_user(message.Name)
-                    self._bot.dispatch("donation", user, float(message.Amount), message.Currency)
+                for message in messages:
+                    self._add("donation", user(message.Name), float(message.Amount), message.Currency)
         self._bot.dispatch("event_receive", sender, args.Data)
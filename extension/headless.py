@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import os
+import json
+import time
+import random
+
+from .abc import Platforms
+
+__all__ = [
+    "HeadlessParent",
+    "HeadlessData",
+    "HeadlessRuntime"
+]
+
+
+class HeadlessParent(object):
+    """
+    an in-memory stand-in for the ``Parent`` object the chatbot injects into scripts, so that bots can run,
+    be tested and be benchmarked under plain python.
+    everything the chatbot would normally store is kept in plain attributes, which can be set up and inspected freely.
+
+    Attributes
+    -----------
+    channel: the name of the streamer. the streamer has every permission
+    live: whether the stream is live
+    points, hours, ranks: dicts of user id to their currency, hours and rank
+    permissions: a dict of user id to a set of permission names, IE ``{"someone": {"Moderator"}}``
+    display_names: a dict of user id to display name. defaults to the user id
+    viewers: the ids of everyone in chat. active_users: the ids of everyone recently active
+    http: a dict of url to the response body of GET/POST/PUT/DELETE requests. the body can be a string, a json
+    serializable object or a callable taking the method, url, headers and payload.
+    sent: every message sent, as ``(kind, target, message)`` tuples. kind is stream, whisper, discord or discord_dm
+    logs: every logged line, as ``(script, message)`` tuples. ws_events: every broadcast ``(event, data)``
+    """
+    def __init__(self, channel="streamer", live=True, currency="points", seed=None):
+        self.channel = channel.lower()
+        self.live = live
+        self.currency = currency
+        self.points = {}
+        self.hours = {}
+        self.ranks = {}
+        self.permissions = {}
+        self.display_names = {}
+        self.viewers = []
+        self.active_users = []
+        self.http = {}
+        self.sent = []
+        self.logs = []
+        self.ws_events = []
+        self.sounds = []
+        self.cooldowns = {}
+        self.random = random.Random(seed)
+        self.clock = time.time
+
+    # chat
+
+    def SendStreamMessage(self, message):
+        self.sent.append(("stream", None, message))
+
+    def SendStreamWhisper(self, target, message):
+        self.sent.append(("whisper", target, message))
+
+    def SendDiscordMessage(self, message):
+        self.sent.append(("discord", None, message))
+
+    def SendDiscordDM(self, target, message):
+        self.sent.append(("discord_dm", target, message))
+
+    def BroadcastWSEvent(self, event, data, *args, **kwargs):
+        self.ws_events.append((event, data))
+        return json.dumps({"status": 200})
+
+    def Log(self, script, message):
+        self.logs.append((script, message))
+
+    def PlaySound(self, path, volume):
+        self.sounds.append((path, volume))
+        return True
+
+    # channel
+
+    def GetChannelName(self):
+        return self.channel
+
+    def IsLive(self):
+        return self.live
+
+    def GetCurrencyName(self):
+        return self.currency
+
+    def GetViewerList(self):
+        return list(self.viewers)
+
+    def GetActiveUsers(self):
+        return list(self.active_users)
+
+    def GetRandomActiveUser(self):
+        return self.random.choice(self.active_users) if self.active_users else None
+
+    def GetDisplayName(self, user):
+        return self.display_names.get(user.lower(), user)
+
+    def GetDisplayNames(self, users):
+        return dict((user, self.GetDisplayName(user)) for user in users)
+
+    # currency
+
+    def GetPoints(self, user):
+        return self.points.get(user.lower(), 0)
+
+    def GetHours(self, user):
+        return self.hours.get(user.lower(), 0)
+
+    def GetRank(self, user):
+        return self.ranks.get(user.lower(), "")
+
+    def AddPoints(self, user, name, amount):
+        user = user.lower()
+        self.points[user] = self.points.get(user, 0) + amount
+        return True
+
+    def RemovePoints(self, user, name, amount):
+        user = user.lower()
+        if self.points.get(user, 0) < amount:
+            return False
+
+        self.points[user] -= amount
+        return True
+
+    def AddPointsAll(self, data):
+        return [user for user, amount in data.items() if not self.AddPoints(user, user, amount)]
+
+    def RemovePointsAll(self, data):
+        return [user for user, amount in data.items() if not self.RemovePoints(user, user, amount)]
+
+    def GetTopCurrency(self, top):
+        return dict(sorted(self.points.items(), key=lambda x: x[1], reverse=True)[:top])
+
+    def GetTopHours(self, top):
+        return dict(sorted(self.hours.items(), key=lambda x: x[1], reverse=True)[:top])
+
+    # permissions
+
+    def HasPermission(self, user, permission, info):
+        user = user.lower()
+        if permission == "Everyone" or user == self.channel:
+            return True
+
+        if permission == "User_Specific":
+            return user == str(info).lower()
+
+        if permission == "Min_Points":
+            return self.GetPoints(user) >= int(info)
+
+        if permission == "Min_Hours":
+            return self.GetHours(user) >= float(info)
+
+        if permission == "Min_Rank":
+            return self.GetRank(user) == info
+
+        return permission in self.permissions.get(user, ())
+
+    # cooldowns
+
+    def AddCooldown(self, script, command, seconds):
+        self.cooldowns[(script, command, None)] = self.clock() + seconds
+
+    def AddUserCooldown(self, script, command, user, seconds):
+        self.cooldowns[(script, command, user.lower())] = self.clock() + seconds
+
+    def IsOnCooldown(self, script, command):
+        return self.GetCooldownDuration(script, command) > 0
+
+    def IsOnUserCooldown(self, script, command, user):
+        return self.GetUserCooldownDuration(script, command, user) > 0
+
+    def GetCooldownDuration(self, script, command):
+        return max(0, int(self.cooldowns.get((script, command, None), 0) - self.clock()))
+
+    def GetUserCooldownDuration(self, script, command, user):
+        return max(0, int(self.cooldowns.get((script, command, user.lower()), 0) - self.clock()))
+
+    # http
+
+    def _request(self, method, url, headers, payload=None):
+        body = self.http.get(url)
+        if body is None:
+            return json.dumps({"status": 404, "response": "", "error": "no stub for " + url})
+
+        if callable(body):
+            body = body(method, url, headers, payload)
+
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return json.dumps({"status": 200, "response": body})
+
+    def GetRequest(self, url, headers):
+        return self._request("GET", url, headers)
+
+    def PostRequest(self, url, headers, content, isJsonContent=True):
+        return self._request("POST", url, headers, content)
+
+    def PutRequest(self, url, headers, content, isJsonContent=True):
+        return self._request("PUT", url, headers, content)
+
+    def DeleteRequest(self, url, headers):
+        return self._request("DELETE", url, headers)
+
+
+class HeadlessData(object):
+    """
+    a stand-in for the data object the chatbot passes to Execute.
+
+    Parameters
+    -----------
+    user: the user id of the author
+    message: the chat message. for raw data, this is the raw irc line
+    platform: one of the :class:`Platforms` values
+    raw: the raw data. if not given, chat messages get a minimal PRIVMSG line
+    chat: whether this is a chat message, or raw data
+    whisper: whether the message was a whisper/DM
+    username: the display name of the author
+    """
+    __slots__ = ("User", "UserName", "Message", "RawData", "ServiceType", "_chat", "_whisper", "_params")
+
+    def __init__(self, user="", message="", platform=Platforms.twitch, raw=None, chat=True, whisper=False,
+                 username=None):
+        self.User = user.lower()
+        self.UserName = username or user
+        self.Message = message
+        self.ServiceType = Platforms.sources[platform]
+        self._chat = chat
+        self._whisper = whisper
+        self._params = None
+        if raw is None:
+            raw = message if not chat else ":{0}!{0}@{0}.tmi.twitch.tv PRIVMSG #channel :{1}".format(self.User, message)
+        self.RawData = raw
+
+    def IsChatMessage(self):
+        return self._chat
+
+    def IsRawData(self):
+        return not self._chat
+
+    def IsWhisper(self):
+        return self._whisper
+
+    def IsFromTwitch(self):
+        return self.ServiceType == "twitch"
+
+    def IsFromMixer(self):
+        return self.ServiceType == "mixer"
+
+    def IsFromYoutube(self):
+        return self.ServiceType == "youtube"
+
+    def IsFromDiscord(self):
+        return self.ServiceType == "discord"
+
+    def GetParam(self, index):
+        if self._params is None:
+            self._params = self.Message.split()
+        try:
+            return self._params[index]
+        except IndexError:
+            return ""
+
+    def GetParamCount(self):
+        if self._params is None:
+            self._params = self.Message.split()
+        return len(self._params)
+
+
+class HeadlessRuntime(object):
+    """
+    drives a bot through the chatbot's lifecycle (Init, Execute, Tick, ReloadSettings, Unload) under plain python.
+
+    Parameters
+    -----------
+    bot: the :class:`Bot` to drive. it doesn't need any listeners, the runtime injects the lifecycle functions itself.
+    parent: the :class:`HeadlessParent` to use. a new one is made if not given
+    script_globals: the globals of the script, if the bot was already injected into them
+    script_name: the ScriptName global the chatbot would normally set
+    """
+    def __init__(self, bot=None, parent=None, script_globals=None, script_name="HeadlessScript"):
+        self.parent = parent or HeadlessParent()
+        self.globals = script_globals if script_globals is not None else {}
+        if bot is not None:
+            bot._inject_to_globals(globals=self.globals)
+        else:
+            # scripts loaded from a file have the bot's lifecycle functions injected already
+            bot = getattr(self.globals.get("Init"), "__self__", None)
+        self.bot = bot
+        if bot is not None:
+            # the Parent's cooldowns follow the bot's clock, so they can be simulated with a VirtualClock too
+            self.parent.clock = bot.clock.time
+        self.globals.setdefault("ScriptName", script_name)
+        self.globals["Parent"] = self.parent
+
+    @classmethod
+    def load_script(cls, path, parent=None):
+        """
+        runs a script file the way the chatbot would, and returns a runtime for it.
+        the script's folder is added to sys.path, so it can import its extension folder.
+        """
+        import sys
+        path = os.path.abspath(path)
+        folder = os.path.dirname(path)
+        if folder not in sys.path:
+            sys.path.append(folder)
+
+        parent = parent or HeadlessParent()
+        script_globals = {"__file__": path, "__name__": os.path.splitext(os.path.basename(path))[0],
+                          "Parent": parent}
+        with open(path) as f:
+            code = compile(f.read(), path, "exec")
+        exec(code, script_globals)
+        return cls(parent=parent, script_globals=script_globals,
+                   script_name=script_globals.get("ScriptName", "HeadlessScript"))
+
+    def init(self):
+        self.globals["Init"]()
+        return self
+
+    def execute(self, data):
+        self.globals["Execute"](data)
+
+    def chat(self, user, message, platform=Platforms.twitch, **kwargs):
+        """
+        sends a chat message from *user* into the bot
+        """
+        self.globals["Execute"](HeadlessData(user, message, platform, **kwargs))
+
+    def raw(self, line, platform=Platforms.twitch):
+        """
+        sends a raw irc line into the bot
+        """
+        self.globals["Execute"](HeadlessData(message=line, platform=platform, chat=False))
+
+    def tick(self, count=1):
+        tick = self.globals["Tick"]
+        for _ in range(count):
+            tick()
+
+    def advance(self, seconds, step=0.1):
+        """
+        moves the bot's :class:`VirtualClock` forward by *seconds*, ticking every *step* seconds along the way.
+        this is how hours of scheduled events and cooldowns are simulated without waiting for them.
+        """
+        clock = self.bot.clock
+        if not clock.virtual:
+            raise TypeError("advance needs a bot created with a VirtualClock")
+
+        end = clock.time() + seconds
+        tick = self.globals["Tick"]
+        while clock.time() < end:
+            clock.set(min(end, clock.time() + step))
+            tick()
+
+    def reload_settings(self, settings):
+        self.globals["ReloadSettings"](settings if isinstance(settings, str) else json.dumps(settings))
+
+    def unload(self):
+        unload = self.globals.get("Unload")
+        if unload is not None:
+            unload()
+        elif self.bot is not None:
+            self.bot.unload()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import io
+import json
+import random
+from bisect import bisect_left
+
+__all__ = [
+    "Zipf",
+    "Burst",
+    "Raid",
+    "LoadProfile",
+    "LoadGenerator"
+]
+
+_words = ("lol", "pog", "gg", "nice", "what", "is", "that", "wow", "hello", "chat", "kappa", "no", "yes", "haha",
+          "the", "streamer", "clip", "it", "again", "first", "time", "here", "love", "this", "game", "lul")
+
+
+class Zipf(object):
+    """
+    samples ranks 0..n-1 following a zipfian distribution, where rank 0 is the most popular.
+    a skew of 0 is uniform, higher skews concentrate more on the first few ranks.
+    """
+    __slots__ = ("n", "skew", "_cumulative")
+
+    def __init__(self, n, skew=1.1):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+
+        self.n = n
+        self.skew = skew
+        total = 0.0
+        self._cumulative = cumulative = []
+        for rank in range(1, n + 1):
+            total += 1.0 / rank ** skew
+            cumulative.append(total)
+
+    def sample(self, rng):
+        return min(self.n - 1, bisect_left(self._cumulative, rng.random() * self._cumulative[-1]))
+
+
+class Burst(object):
+    """
+    multiplies the chat rate by *multiplier* for *length* seconds, starting at *start*, and adds *rate* messages
+    per second on top. the added rate lets bursts happen in an otherwise quiet chat
+    """
+    __slots__ = ("start", "length", "multiplier", "rate")
+
+    def __init__(self, start, length, multiplier, rate=0.0):
+        self.start = start
+        self.length = length
+        self.multiplier = multiplier
+        self.rate = rate
+
+
+class Raid(object):
+    """
+    a raid of *size* viewers arriving at *start*. a share of the raiders (*chatters*) chat at *rate* messages per
+    second (in total) for *length* seconds, on top of the normal chat.
+    """
+    __slots__ = ("start", "size", "raider", "chatters", "rate", "length")
+
+    def __init__(self, start, size, raider="raider", chatters=0.1, rate=200.0, length=30.0):
+        self.start = start
+        self.size = size
+        self.raider = raider
+        self.chatters = chatters
+        self.rate = rate
+        self.length = length
+
+
+class LoadProfile(object):
+    """
+    describes the load to generate.
+
+    Parameters
+    -----------
+    duration: the length of the session, in seconds
+    users: the amount of regular chatters. how often each one chats follows a zipfian distribution with *user_skew*
+    rate: chat messages per second, before bursts
+    commands: the commands to use, including the prefix and any arguments, IE ``["!points", "!slots 100"]``.
+        which command is used follows a zipfian distribution with *command_skew*, the first command being the most used.
+    command_ratio: the share of chat messages that are commands
+    bursts: a list of :class:`Burst`
+    raids: a list of :class:`Raid`
+    follows, subs, cheers, donations: streamlabs events per second
+    platform: the platform the chat messages are from
+    seed: the random seed. the same profile with the same seed always generates the same session
+    """
+    def __init__(self, duration=60.0, users=1000, rate=20.0, commands=("!ping",), command_ratio=0.2, user_skew=1.0,
+                 command_skew=1.2, bursts=(), raids=(), follows=0.05, subs=0.01, cheers=0.01, donations=0.0,
+                 platform="twitch", seed=0):
+        self.duration = duration
+        self.users = users
+        self.rate = rate
+        self.commands = list(commands)
+        self.command_ratio = command_ratio
+        self.user_skew = user_skew
+        self.command_skew = command_skew
+        self.bursts = list(bursts)
+        self.raids = list(raids)
+        self.follows = follows
+        self.subs = subs
+        self.cheers = cheers
+        self.donations = donations
+        self.platform = platform
+        self.seed = seed
+
+    @classmethod
+    def from_bot(cls, bot, **kwargs):
+        """
+        creates a profile that uses every command registered to *bot*
+        """
+        prefix = bot.prefix if isinstance(bot.prefix, str) else list(bot.prefix)[0]
+        kwargs.setdefault("commands", [prefix + name for name in sorted(c.name for c in bot.commands)])
+        return cls(**kwargs)
+
+    def rate_at(self, t):
+        rate = self.rate
+        for burst in self.bursts:
+            if burst.start <= t < burst.start + burst.length:
+                rate = rate * burst.multiplier + burst.rate
+        return rate
+
+    def peak_rate(self):
+        """
+        the highest chat rate at any point in the session
+        """
+        # the rate only changes where a burst starts or ends
+        edges = [0.0]
+        for burst in self.bursts:
+            edges.extend((burst.start, burst.start + burst.length))
+        return max(self.rate_at(t) for t in edges if 0.0 <= t < self.duration) if self.duration > 0 else 0.0
+
+
+class LoadGenerator(object):
+    """
+    generates a synthetic session from a :class:`LoadProfile`.
+    the records use the same format as recorded sessions (see :func:`extension.replay.load_session`),
+    so they can be fed into a bot with :class:`extension.replay.Replayer`, or written to a file with :meth:`write`.
+    """
+    def __init__(self, profile):
+        self.profile = profile
+
+    def _arrivals(self, rng, rate, start, end, peak=None):
+        # poisson arrivals. the rate may be a callable of the current time (for bursts), in which case arrivals are
+        # generated at the *peak* rate and thinned down to the rate at each arrival's time
+        if not callable(rate):
+            peak = rate
+        if not peak or peak <= 0:
+            return
+
+        t = start
+        while True:
+            t += rng.expovariate(peak)
+            if t >= end:
+                return
+            if callable(rate) and rng.random() * peak >= rate(t):
+                continue
+            yield t
+
+    def _text(self, rng, commands):
+        profile = self.profile
+        if profile.commands and rng.random() < profile.command_ratio:
+            return profile.commands[commands.sample(rng)]
+        return " ".join(rng.choice(_words) for _ in range(rng.randint(1, 8)))
+
+    def records(self):
+        """
+        returns the generated records, sorted by time
+        """
+        profile = self.profile
+        rng = random.Random(profile.seed)
+        users = Zipf(profile.users, profile.user_skew)
+        commands = Zipf(max(1, len(profile.commands)), profile.command_skew)
+        records = []
+
+        for t in self._arrivals(rng, profile.rate_at, 0.0, profile.duration, profile.peak_rate()):
+            records.append({"t": t, "kind": "chat", "user": "user{0}".format(users.sample(rng)),
+                            "message": self._text(rng, commands), "platform": profile.platform})
+
+        for raid in profile.raids:
+            records.append({"t": raid.start, "kind": "raw", "platform": profile.platform, "line":
+                            "@msg-id=raid;msg-param-displayName={0};msg-param-login={0};msg-param-viewerCount={1} "
+                            ":tmi.twitch.tv USERNOTICE "
+                            "#channel".format(raid.raider, raid.size)})
+            chatters = max(1, int(raid.size * raid.chatters))
+            for t in self._arrivals(rng, raid.rate, raid.start, min(profile.duration, raid.start + raid.length)):
+                records.append({"t": t, "kind": "chat", "user": "{0}_{1}".format(raid.raider, rng.randrange(chatters)),
+                                "message": self._text(rng, commands), "platform": profile.platform})
+
+        def event(rate, type, fields, account="twitch_account"):
+            for t in self._arrivals(rng, rate, 0.0, profile.duration):
+                message = {"Id": "{0}-{1}".format(type, len(records)), "Name": "user{0}".format(users.sample(rng))}
+                message.update(fields())
+                records.append({"t": t, "kind": "streamlabs", "for": account, "type": type, "messages": [message]})
+
+        event(profile.follows, "follow", dict)
+        event(profile.subs, "subscription", lambda: {"Months": rng.choice((1, 1, 1, 2, 3, 6, 12)), "SubPlan": "1000"})
+        event(profile.cheers, "bits", lambda: {"Amount": rng.choice((1, 10, 100, 500, 1000)), "Message": "cheer"})
+        event(profile.donations, "donation", lambda: {"Amount": rng.choice((1, 5, 10, 50)), "Currency": "USD"},
+              "streamlabs")
+
+        records.sort(key=lambda r: r["t"])
+        return records
+
+    def write(self, path):
+        """
+        writes the generated session to *path*, so it can be replayed later
+        """
+        with io.open(path, "w", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record, sort_keys=True) + u"\n")
+
+    def run(self, runtime, tick_interval=0.1, realtime=False):
+        """
+        feeds the generated session into an initialized :class:`HeadlessRuntime`, and returns the
+        :class:`extension.replay.ReplayReport`
+        """
+        from .replay import Replayer
+        return Replayer(runtime, tick_interval, realtime).run(self.records())
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import sys
+import types
+
+from .metrics import Histogram
+from .clock import perf_timer as _timer
+from .tasks import sleep
+
+__all__ = [
+    "Loop",
+]
+
+
+def _ignore(exc, tb):
+    pass
+
+
+class Loop(object):
+    """
+    a function run every *interval* seconds from Tick, made with :meth:`Bot.loop`.
+    the next run is worked out from when the last one was due rather than when it ran, so a slow tick or a slow
+    iteration doesn't push every later run back. runs that are already due when the last one finishes are
+    skipped (see :attr:`missed`) instead of being run back to back.
+
+    Parameters
+    -----------
+    interval: seconds between runs
+    jitter: each run is delayed by a random amount up to this many seconds, so loops with the same interval
+        don't all run on the same tick. the delay doesn't add up between runs. it must be less than the interval
+    count: how many times to run before stopping. runs forever if None
+    autostart: whether the bot starts the loop when it's initialized
+    """
+    def __init__(self, bot, func, interval, jitter=0.0, count=None, name=None, autostart=False):
+        if interval <= 0:
+            raise ValueError("loop interval must be more than 0 seconds")
+        if not 0 <= jitter < interval:
+            raise ValueError("loop jitter must be at least 0 and less than the interval")
+
+        self._bot = bot
+        self.func = func
+        self.name = name or func.__name__
+        self._interval = float(interval)
+        self.jitter = jitter
+        self.count = count
+        self.autostart = autostart
+        self.iterations = 0
+        self.missed = 0
+        # how long each run took, from when the function was called until it (or its task) finished
+        self.durations = Histogram()
+        self.last_duration = None
+        # how late the last run started, past the time it was due
+        self.last_delay = None
+        self.next_iteration = None
+        self._args = ()
+        self._kwargs = {}
+        self._task = None
+        self._running_iteration = False
+        self._stopping = False
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return "<Loop {0} every {1}s {2}>".format(self.name, self._interval, "running" if self.running else "stopped")
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done
+
+    def start(self, *args, **kwargs):
+        """
+        starts the loop, with the given arguments passed to the function every run.
+        the first run happens on the next tick. loops made with ``autostart`` are started when the bot is initialized
+        """
+        if self.running:
+            raise RuntimeError("loop {0} is already running".format(self.name))
+
+        self._args = args
+        self._kwargs = kwargs
+        self.iterations = 0
+        self._stopping = False
+        self._schedule(self._bot.clock.time())
+
+    def stop(self):
+        """
+        stops the loop. when called from inside the loop, the current run finishes first
+        """
+        if not self.running:
+            return
+
+        if self._running_iteration:
+            self._stopping = True
+        else:
+            self._task.cancel()
+        self.next_iteration = None
+
+    def change_interval(self, seconds=0, minutes=0, hours=0):
+        """
+        changes how often the loop runs. a running loop runs next one new interval after its last run was due
+        """
+        interval = seconds + minutes * 60 + hours * 3600
+        if interval <= 0:
+            raise ValueError("loop interval must be more than 0 seconds")
+        if self.jitter >= interval:
+            raise ValueError("loop interval must be more than its jitter ({0}s)".format(self.jitter))
+
+        previous, self._interval = self._interval, float(interval)
+        if self.running and not self._running_iteration:
+            # the task is asleep until the old due time, so restart it towards the new one
+            self._task.cancel()
+            self._schedule(max(self._due - previous + self._interval, self._bot.clock.time()))
+
+    def _schedule(self, due):
+        self._due = due
+        self._task = self._bot.tasks.create(self._run(), "loop:" + self.name)
+
+    def _run(self):
+        bot = self._bot
+        clock = bot.clock
+        while True:
+            fire = self._due + (bot.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            self.next_iteration = fire
+            # always yield at least once, so the function runs from Tick rather than from wherever start() was called
+            yield sleep(max(fire - clock.time(), 0.0))
+
+            self.last_delay = clock.time() - fire
+            self._running_iteration = True
+            start = _timer()
+            try:
+                ret = self.func(*self._args, **self._kwargs)
+                if isinstance(ret, types.GeneratorType):
+                    # errors in the task are raised here, so they're only reported once
+                    yield bot.tasks.create(ret, "loop:" + self.name, _ignore)
+            except Exception as e:
+                bot._inner_dispatch("error", e, sys.exc_info()[2])
+            finally:
+                self._running_iteration = False
+
+            self.last_duration = _timer() - start
+            self.durations.add(self.last_duration)
+            self.iterations += 1
+            if self._stopping or (self.count is not None and self.iterations >= self.count):
+                self.next_iteration = None
+                return
+
+            # the next run is due one interval after this one was due, not after it finished.
+            # runs that are already due by now are skipped, rather than run back to back
+            self._due += self._interval
+            behind = clock.time() - self._due
+            if behind >= 0:
+                skipped = int(behind // self._interval) + 1
+                self.missed += skipped
+                self._due += skipped * self._interval
+
+    def to_dict(self):
+        return {"name": self.name, "interval": self._interval, "running": self.running,
+                "iterations": self.iterations, "missed": self.missed, "last_duration": self.last_duration,
+                "last_delay": self.last_delay, "durations": self.durations.to_dict()}
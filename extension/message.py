@@ -25,23 +25,21 @@ DEALINGS IN THE SOFTWARE.
 """
 from .errors import *
 from .abc import *
-import datetime
 from .view import StringView
 
 __all__ = ["Message"]
 
 class Message:
-    __slots__ = ("__bot", "author", "timestamp", "_content", "_channel", "view", "prefix", "command",
-                 "did_fail", "args", "kwargs", "data", "parent")
+    __slots__ = ("bot", "author", "timestamp", "_content", "_channel", "view", "prefix", "command",
+                 "did_fail", "args", "kwargs", "data", "rawdata")
     def __init__(self, bot, aid, aname, content, channel, data):
         self.data = data
         self.bot = bot
-        self.parent = bot.parent
         if not isinstance(aid, User):
             aid = User(aid, aname, bot=bot)
         self.author = aid
         self.rawdata = data.RawData
-        self.timestamp = datetime.datetime.now()
+        self.timestamp = bot.clock.now()
         self._content = content
         if not isinstance(channel, Channel):
             channel = Channel(bot, channel)
@@ -83,6 +81,10 @@ class Message:
         :return:
         """
 
+    @property
+    def parent(self):
+        return self.bot.parent
+
     @property
     def content(self):
         return self._content
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import json
+import threading
+from bisect import bisect_left
+
+from .errors import ChecksFailed, CommandOnCooldown, UserInputError
+from .clock import perf_timer as _timer
+
+__all__ = [
+    "Histogram",
+    "CommandMetrics",
+    "MetricsRegistry",
+    "ParentStats",
+    "ParentProxy"
+]
+
+
+
+class Histogram(object):
+    """
+    a fixed bucket latency histogram, so memory use stays the same no matter how many values are added.
+    values are in seconds.
+    """
+    __slots__ = ("counts", "count", "total", "max")
+    # upper bounds of each bucket, the last bucket holds everything above the last bound
+    bounds = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+        returns the upper bound of the bucket the given percentile (0-100) falls in
+        """
+        if not self.count:
+            return 0.0
+
+        wanted = self.count * percent / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "max": self.max, "p50": self.percentile(50),
+                "p90": self.percentile(90), "p99": self.percentile(99), "buckets": list(self.counts)}
+
+
+class CommandMetrics(object):
+    """
+    the metrics of a single command
+    """
+    __slots__ = ("name", "invocations", "rejections", "phases")
+
+    def __init__(self, name):
+        self.name = name
+        self.invocations = 0
+        self.rejections = {}
+        self.phases = dict((phase, Histogram()) for phase in MetricsRegistry.phases)
+
+    def to_dict(self):
+        return {"invocations": self.invocations, "rejections": dict(self.rejections),
+                "phases": dict((name, hist.to_dict()) for name, hist in self.phases.items() if hist.count)}
+
+
+class _Timing(object):
+    # records each phase of a command into its metrics, its trace, or both
+    __slots__ = ("stats", "trace", "timer", "start", "last")
+
+    def __init__(self, stats, timer, trace=None):
+        self.stats = stats
+        self.trace = trace
+        self.timer = timer
+        self.start = self.last = timer()
+
+    def __call__(self, phase):
+        now = self.timer()
+        if self.stats is not None:
+            self.stats.phases[phase].add(now - self.last)
+        if self.trace is not None:
+            self.trace.spans.append((phase, self.last, now))
+        self.last = now
+
+    def finish(self):
+        if self.stats is not None:
+            self.stats.phases["total"].add(self.timer() - self.start)
+
+
+def _noop(phase):
+    pass
+
+
+class MetricsRegistry(object):
+    """
+    per-command invocation counts, rejections and per-phase latency histograms, available as :attr:`Bot.metrics`
+    when the bot is created with ``enable_metrics=True``.
+    the phases are checks, cooldowns, parsing, pre_hook, callback, post_hook, and the total.
+    rejections are counted by reason: check, cooldown, conversion or error.
+    """
+    phases = ("checks", "cooldowns", "parsing", "pre_hook", "callback", "post_hook", "total")
+
+    def __init__(self, timer=_timer):
+        self._timer = timer
+        self._commands = {}
+
+    def __getitem__(self, name):
+        return self._commands[name]
+
+    def __contains__(self, name):
+        return name in self._commands
+
+    def get(self, name):
+        """
+        returns the :class:`CommandMetrics` for a command, by its qualified name
+        """
+        stats = self._commands.get(name)
+        if stats is None:
+            stats = self._commands[name] = CommandMetrics(name)
+        return stats
+
+    def start(self, command, trace=None):
+        """
+        counts an invocation of the command, and returns a callable that records the time since the previous call
+        under the phase passed to it. if a :class:`~.spans.Trace` is given, the phases are also recorded as its spans.
+        """
+        stats = self.get(command.qualified_name)
+        stats.invocations += 1
+        return _Timing(stats, self._timer, trace)
+
+    def reject(self, command, exception):
+        if isinstance(exception, ChecksFailed):
+            reason = "check"
+        elif isinstance(exception, CommandOnCooldown):
+            reason = "cooldown"
+        elif isinstance(exception, UserInputError):
+            reason = "conversion"
+        else:
+            reason = "error"
+
+        rejections = self.get(command.qualified_name).rejections
+        rejections[reason] = rejections.get(reason, 0) + 1
+
+    def top(self, amount=5, phase="total"):
+        """
+        returns the *amount* commands with the highest mean time in the given phase, as ``(name, histogram)`` tuples
+        """
+        ranked = sorted(((name, stats.phases[phase]) for name, stats in self._commands.items()),
+                        key=lambda x: x[1].mean, reverse=True)
+        return ranked[:amount]
+
+    def reset(self):
+        self._commands.clear()
+
+    def to_dict(self):
+        return dict((name, stats.to_dict()) for name, stats in self._commands.items())
+
+    def dump(self, path):
+        """
+        writes the metrics to a json file
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4, sort_keys=True)
+
+
+class ParentStats(object):
+    """
+    counts the calls made into the chatbot's ``Parent`` object, and the time they took, per method and per origin.
+    the origin is the command, listener or event that was being handled when the call was made, IE ``command:points``.
+    events scheduled while handling something keep its origin, so the messages a command sends are counted under the
+    command. available as :attr:`Bot.parent_stats` when the bot is created with ``enable_parent_stats=True``.
+    """
+    unattributed = "unattributed"
+
+    def __init__(self, timer=_timer):
+        self.timer = timer
+        self._calls = {}
+        self._local = threading.local()
+
+    @property
+    def origin(self):
+        """
+        the origin calls are currently attributed to, or None
+        """
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def push(self, origin):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(origin)
+
+    def pop(self):
+        self._local.stack.pop()
+
+    def record(self, method, elapsed):
+        key = (self.origin or self.unattributed, method)
+        entry = self._calls.get(key)
+        if entry is None:
+            entry = self._calls[key] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    def _matching(self, method, origin):
+        for (call_origin, call_method), entry in self._calls.items():
+            if (method is None or call_method == method) and (origin is None or call_origin == origin):
+                yield entry
+
+    def calls(self, method=None, origin=None):
+        """
+        the amount of calls made, optionally only to *method* and/or from *origin*
+        """
+        return sum(entry[0] for entry in self._matching(method, origin))
+
+    def time(self, method=None, origin=None):
+        """
+        the time (in seconds) spent in calls, optionally only to *method* and/or from *origin*
+        """
+        return sum(entry[1] for entry in self._matching(method, origin))
+
+    def methods(self):
+        """
+        returns a dict of method name to its total amount of calls
+        """
+        ret = {}
+        for (_, method), entry in self._calls.items():
+            ret[method] = ret.get(method, 0) + entry[0]
+        return ret
+
+    def top(self, amount=5):
+        """
+        returns the *amount* origin/method pairs that spent the most time in Parent,
+        as ``(origin, method, calls, total time)`` tuples
+        """
+        ranked = sorted(((origin, method, entry[0], entry[1]) for (origin, method), entry in self._calls.items()),
+                        key=lambda x: x[3], reverse=True)
+        return ranked[:amount]
+
+    def reset(self):
+        self._calls.clear()
+
+    def to_dict(self):
+        ret = {}
+        for (origin, method), (calls, total) in self._calls.items():
+            ret.setdefault(origin, {})[method] = {"calls": calls, "time": total}
+        return ret
+
+
+class ParentProxy(object):
+    """
+    wraps the ``Parent`` object, recording every method call into a :class:`ParentStats`.
+    attributes that aren't callable are passed through untouched.
+    """
+    def __init__(self, parent, stats):
+        self.wrapped = parent
+        self.stats = stats
+
+    def __getattr__(self, name):
+        attr = getattr(self.wrapped, name)
+        if not callable(attr):
+            return attr
+
+        stats = self.stats
+        timer = stats.timer
+
+        def method(*args, **kwargs):
+            start = timer()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                stats.record(name, timer() - start)
+
+        # cache the wrapper, so __getattr__ is only hit once per method
+        setattr(self, name, method)
+        return method
@@ -23,15 +23,18 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
-from TwitchLib.PubSub import TwitchPubSub
 from .node import Node
+from . import dotnet
 import json
 
 class PubSubListener(Node):
     def __init__(self, bot):
         self.bot = bot
+        self.connection = None
+        # the listeners go through the bot, as it can't store its flag on a bound method
+        bot.add_listener(lambda: self.on_init(), "on_init")
+        bot.add_listener(lambda payload: self.on_reload_settings(payload), "on_reload_settings")
 
-    @Node.listener()
     def on_init(self):
         if not self.bot.settings.TwitchApiUsername and self.bot.client_id:
             self.connection = None
@@ -39,13 +42,18 @@ class PubSubListener(Node):
             self.initialize()
 
     def initialize(self):
+        # TwitchLib is only loaded once pubsub is actually used
+        dotnet.require("pubsub")
+        from TwitchLib.PubSub import TwitchPubSub
         self.connection = TwitchPubSub()
         self.connection.OnPubSubServiceConnected += self.on_pubsub_connect
         self.connection.OnRewarRedeem += self.on_pubsub_redeem
         self.connection.Connect()
 
-    @Node.listener()
-    def on_settings_reload(self, *_):
+    def on_reload_settings(self, payload):
+        if "TwitchApiUsername" not in getattr(payload, "changed", payload):
+            return
+
         if self.connection is not None:
             self.connection.Disconnect()
 
@@ -63,5 +71,10 @@ class PubSubListener(Node):
         self.connection.SendTopics()
 
     def on_pubsub_redeem(self, sender, data):
+        # pubsub can replay redemptions when it reconnects
+        if self.bot.event_dedup.seen(getattr(data, "RedemptionId", None), "pubsub_redeem", getattr(data, "Login", None),
+                                     getattr(data, "RewardId", None), getattr(data, "TimeStamp", None)):
+            return
+
         self.bot.dispatch("pubsub_redeem", data.RewardTitle)
 
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import io
+import sys
+import json
+import time
+import difflib
+import itertools
+
+from .abc import Platforms
+from .headless import HeadlessRuntime
+from .clock import perf_timer as _timer
+
+__all__ = [
+    "load_session",
+    "ReplayReport",
+    "Replayer"
+]
+
+_platforms = dict((name, value) for value, name in Platforms.sources.items())
+
+
+def load_session(path):
+    """
+    reads a recorded session. sessions are JSONL files, with one record per line. every record has a ``t`` key,
+    the seconds since the start of the session, and a ``kind``, which is one of:
+
+    - ``chat``: a chat message. keys: ``user``, ``message``, and optionally ``platform`` and ``whisper``
+    - ``raw``: a raw irc line. keys: ``line``, and optionally ``platform``
+    - ``discord``: a discord message. keys: ``user``, ``message``, and optionally ``whisper``
+    - ``streamlabs``: a streamlabs socket event. keys: ``for``, ``type``, and ``messages``, a list of dicts with the
+      fields of the event, IE ``{"Name": "someone", "Amount": 100}``
+    - ``tick``: forces a tick
+
+    the records are returned sorted by time.
+    """
+    records = []
+    with io.open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                records.append(json.loads(line))
+
+    records.sort(key=lambda r: r.get("t", 0))
+    return records
+
+
+class _Payload(object):
+    # stands in for the .NET objects of the streamlabs receiver, missing fields are None just like nullable fields
+    def __init__(self, fields):
+        self.__dict__.update(fields)
+
+    def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
+        return None
+
+
+class ReplayReport(object):
+    """
+    the results of a replay.
+
+    Attributes
+    -----------
+    events: the amount of records fed into the bot
+    ticks: the amount of ticks ran
+    duration: the wall time the replay took, in seconds
+    latencies: the time from feeding each record until the events it queued were dispatched, in seconds
+    queue_depth: the amount of pending events after each tick, as ``(session time, depth)`` tuples
+    sent: every outgoing message, as ``(session time, kind, target, message)`` tuples
+    """
+    def __init__(self):
+        self.events = 0
+        self.ticks = 0
+        self.duration = 0.0
+        self.latencies = []
+        self.queue_depth = []
+        self.sent = []
+
+    @property
+    def events_per_second(self):
+        return self.events / self.duration if self.duration else 0.0
+
+    def percentile(self, percent):
+        """
+        returns the latency (in seconds) below which *percent* of the records were handled
+        """
+        if not self.latencies:
+            return 0.0
+
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def max_queue_depth(self):
+        return max([depth for _, depth in self.queue_depth] or [0])
+
+    def to_dict(self):
+        return {
+            "events": self.events,
+            "ticks": self.ticks,
+            "duration": self.duration,
+            "events_per_second": self.events_per_second,
+            "latency": {"p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99),
+                        "max": max(self.latencies or [0.0])},
+            "max_queue_depth": self.max_queue_depth,
+            "sent": len(self.sent)
+        }
+
+    def format(self):
+        data = self.to_dict()
+        lat = data['latency']
+        return ("{events} events in {duration:.3f}s ({events_per_second:.1f}/s), {ticks} ticks, {sent} messages sent\n"
+                "latency p50 {p50:.6f}s p90 {p90:.6f}s p99 {p99:.6f}s max {max:.6f}s\n"
+                "max queue depth {max_queue_depth}").format(p50=lat['p50'], p90=lat['p90'], p99=lat['p99'],
+                                                             max=lat['max'], **data)
+
+    def outgoing(self, timestamps=False):
+        """
+        the outgoing messages as lines, used for diffing. timestamps are left out by default,
+        as they differ between real-time and as-fast-as-possible replays
+        """
+        lines = []
+        for t, kind, target, message in self.sent:
+            line = json.dumps([kind, target, message])
+            lines.append("{0:.3f} {1}".format(t, line) if timestamps else line)
+        return lines
+
+    def write_outgoing(self, path):
+        with io.open(path, "w", encoding="utf-8") as f:
+            for line in self.outgoing():
+                f.write(line + u"\n")
+
+    def diff(self, expected):
+        """
+        compares the outgoing messages against *expected*, a path written by :meth:`write_outgoing` or a list of lines.
+        returns the unified diff lines, which are empty when the bot behaved the same.
+        """
+        if not isinstance(expected, list):
+            with io.open(expected, encoding="utf-8") as f:
+                expected = [line.rstrip("\n") for line in f if line.strip()]
+
+        return list(difflib.unified_diff(expected, self.outgoing(), "expected", "actual", lineterm=""))
+
+
+class Replayer(object):
+    """
+    feeds a recorded session into a bot through the injected Execute/Tick functions.
+
+    Parameters
+    -----------
+    runtime: the :class:`HeadlessRuntime` to drive. it should already be initialized
+    tick_interval: the session time between ticks, in seconds
+    realtime: replay at the speed the session was recorded at, instead of as fast as possible
+    speed: a multiplier for realtime replays
+
+    when the bot uses a :class:`VirtualClock`, the clock follows the session's timestamps, so a replay
+    that runs as fast as possible still sees the same scheduling and cooldowns as the recording.
+    drain_ticks: the maximum amount of ticks to run after the last record, to let scheduled events finish
+    """
+    def __init__(self, runtime, tick_interval=0.1, realtime=False, speed=1.0, drain_ticks=100):
+        self.runtime = runtime
+        self.tick_interval = tick_interval
+        self.realtime = realtime
+        self.speed = speed
+        self.drain_ticks = drain_ticks
+
+    def _wait(self, started, t):
+        if not self.realtime:
+            return
+
+        delay = started + t / self.speed - _timer()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _collect(self, report, t):
+        sent = self.runtime.parent.sent
+        if len(sent) > self._seen:
+            report.sent.extend((t,) + entry for entry in sent[self._seen:])
+            self._seen = len(sent)
+
+    def _sync(self, t):
+        if self._clock is not None:
+            self._clock.set(self._base + t)
+
+    def _tick(self, report, t):
+        self._sync(t)
+        self.runtime.tick()
+        report.ticks += 1
+        if self._inflight:
+            now = _timer()
+            inflight, self._inflight = self._inflight, []
+            for begin, events in inflight:
+                if all(event._did_fire for event in events):
+                    report.latencies.append(now - begin)
+                else:
+                    self._inflight.append((begin, events))
+        if self.runtime.bot is not None:
+            report.queue_depth.append((t, self.runtime.bot.pending_events))
+        self._collect(report, t)
+
+    def _feed(self, record):
+        kind = record.get("kind", "chat")
+        if kind == "chat":
+            self.runtime.chat(record["user"], record["message"], _platforms[record.get("platform", "twitch")],
+                              whisper=record.get("whisper", False))
+        elif kind == "discord":
+            self.runtime.chat(record["user"], record["message"], Platforms.discord,
+                              whisper=record.get("whisper", False))
+        elif kind == "raw":
+            self.runtime.raw(record["line"], _platforms[record.get("platform", "twitch")])
+        elif kind == "streamlabs":
+            data = _Payload({"For": record["for"], "Type": record["type"],
+                             "Message": [_Payload(m) for m in record.get("messages", [])]})
+            self.runtime.bot._require_events().on_event_receive(None, _Payload({"Data": data}))
+        else:
+            raise ValueError("unknown record kind: {0}".format(kind))
+
+    def run(self, records):
+        """
+        replays *records* (from :func:`load_session`), and returns a :class:`ReplayReport`
+        """
+        report = ReplayReport()
+        self._seen = len(self.runtime.parent.sent)
+        # (fed at, events) of the records whose events haven't been dispatched yet
+        self._inflight = []
+        bot = self.runtime.bot
+        ingress = bot._ingress if bot is not None else None
+        self._clock = bot.clock if bot is not None and bot.clock.virtual else None
+        self._base = self._clock.time() if self._clock is not None else 0.0
+        started = _timer()
+        next_tick = 0.0
+        t = 0.0
+
+        for record in records:
+            t = record.get("t", t)
+            while next_tick <= t:
+                self._wait(started, next_tick)
+                self._tick(report, next_tick)
+                next_tick += self.tick_interval
+
+            self._wait(started, t)
+            if record.get("kind") == "tick":
+                self._tick(report, t)
+                continue
+
+            self._sync(t)
+            queued = len(ingress) if ingress is not None else 0
+            begin = _timer()
+            self._feed(record)
+            # Execute only queues events, so the record is handled once the events it queued have been dispatched
+            events = list(itertools.islice(ingress, queued, None)) if ingress is not None else []
+            if events:
+                self._inflight.append((begin, events))
+            else:
+                report.latencies.append(_timer() - begin)
+            report.events += 1
+            self._collect(report, t)
+
+        # let anything that was scheduled during the session run
+        for _ in range(self.drain_ticks):
+            self._wait(started, next_tick)
+            self._tick(report, next_tick)
+            next_tick += self.tick_interval
+            if self.runtime.bot is None or not self.runtime.bot.pending_events:
+                break
+
+        report.duration = _timer() - started
+        return report
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m extension.replay",
+                                     description="replays a recorded chat session against a script")
+    parser.add_argument("script", help="the script file to load, IE MyScript_StreamlabsSystem.py")
+    parser.add_argument("session", help="the recorded session (JSONL)")
+    parser.add_argument("--realtime", action="store_true", help="replay at recorded speed")
+    parser.add_argument("--speed", type=float, default=1.0, help="speed multiplier for --realtime")
+    parser.add_argument("--tick", type=float, default=0.1, help="session seconds between ticks")
+    parser.add_argument("--record", help="write the outgoing messages to this file")
+    parser.add_argument("--expect", help="diff the outgoing messages against this file")
+    parser.add_argument("--json", action="store_true", help="print the report as json")
+    args = parser.parse_args(argv)
+
+    runtime = HeadlessRuntime.load_script(args.script).init()
+    report = Replayer(runtime, args.tick, args.realtime, args.speed).run(load_session(args.session))
+    runtime.unload()
+
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    if args.record:
+        report.write_outgoing(args.record)
+
+    if args.expect:
+        diff = report.diff(args.expect)
+        if diff:
+            print("\n".join(diff))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,49 +23,259 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
-import os, json, codecs
+import os, json, codecs, time, threading, logging
+
+logger = logging.getLogger(__name__)
 
 searchpath = os.path.dirname(os.path.dirname(__file__))
+_missing = object()
+
+# path: (mtime, schema, defaults, types). the UI_Config only changes when the script is updated,
+# so there's no need to parse it again every time the script is loaded.
+_schema_cache = {}
+
+
+def _load_schema(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    cached = _schema_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached
+
+    with codecs.open(path, encoding="utf-8-sig") as f:
+        root = json.load(f)
+
+    defaults = {}
+    types = {}
+    for name, sets in root.items():
+        if not isinstance(sets, dict) or sets.get('type') == "button":
+            continue
+
+        types[name] = sets.get('type'), sets.get('value')
+        defaults[name] = _coerce(types[name], sets.get('value'))
+
+    cached = _schema_cache[path] = mtime, root, defaults, types
+    return cached
+
+
+def _coerce(typ, value):
+    kind, default = typ
+    try:
+        if kind == "checkbox":
+            return value if isinstance(value, bool) else str(value).lower() in ("true", "1")
+
+        if kind in ("numberbox", "slider"):
+            if isinstance(default, int) and not isinstance(default, bool) and float(value).is_integer():
+                return int(float(value))
+            return float(value)
+
+    except (TypeError, ValueError):
+        return default
+
+    return value
+
+
+def _atomic_write(path, data):
+    # write everything to a temporary file first, so a crash mid-write never leaves a half written file behind
+    tmp = path + ".tmp"
+    try:
+        with codecs.open(tmp, mode="w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+
+        _replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _replace(src, dst):
+    # atomically moves src over dst
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(src, dst)
+        return
+
+    if os.name != "nt" or not os.path.exists(dst):
+        os.rename(src, dst)
+        return
+
+    # windows won't rename over an existing file, and removing it first would leave a moment with no file at all
+    try:
+        import System
+    except ImportError:
+        System = None
+
+    if System is not None:
+        System.IO.File.Replace(src, dst, None)
+        return
+
+    import ctypes
+    # MOVEFILE_REPLACE_EXISTING | MOVEFILE_WRITE_THROUGH
+    if not ctypes.windll.kernel32.MoveFileExW(type(u"")(src), type(u"")(dst), 0x1 | 0x8):
+        raise ctypes.WinError()
+
+
+class WriteBehind(object):
+    """
+    collects json files that need to be written, and writes them once they stop changing.
+    the bot owns one of these as :attr:`Bot.persistence`, which is flushed from Tick and when the bot is unloaded.
+
+    Parameters
+    -----------
+    interval: how many seconds a file must go without changes before it is written
+    max_delay: the most seconds a file can stay dirty, even if it keeps changing. defaults to 6 times the interval
+    """
+    def __init__(self, interval=5.0, max_delay=None, timer=time.time):
+        self.interval = interval
+        self.max_delay = interval * 6 if max_delay is None else max_delay
+        self._timer = timer
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    def __len__(self):
+        return len(self._dirty)
+
+    def mark_dirty(self, path, data):
+        """
+        schedules a file to be written.
+
+        Parameters
+        -----------
+        path: the path of the json file
+        data: the json serializable data, or a callable returning it. a callable is only called when the file is
+        written, so it will always write the latest state.
+        """
+        now = self._timer()
+        with self._lock:
+            entry = self._dirty.get(path)
+            self._dirty[path] = [data, now, entry[2] if entry else now]
+
+    def tick(self):
+        """
+        writes the files that are due. called by the bot every tick
+        """
+        if not self._dirty:
+            return
+
+        now = self._timer()
+        with self._lock:
+            due = [path for path, (_, changed, first) in self._dirty.items()
+                   if now - changed >= self.interval or now - first >= self.max_delay]
+            entries = [(path, self._dirty.pop(path)[0]) for path in due]
+
+        self._write(entries)
+
+    def flush(self):
+        """
+        writes all the dirty files right away
+        """
+        with self._lock:
+            entries = [(path, entry[0]) for path, entry in self._dirty.items()]
+            self._dirty.clear()
+
+        self._write(entries)
+
+    def _write(self, entries):
+        for path, data in entries:
+            try:
+                _atomic_write(path, data() if callable(data) else data)
+            except Exception:
+                logger.exception("failed to write %s, it will be retried", path)
+                now = self._timer()
+                with self._lock:
+                    # unless it was changed again in the meantime, try again once the interval passes
+                    self._dirty.setdefault(path, [data, now, now])
+                continue
+
+            self.writes += 1
+
+
+class ReloadPayload(dict):
+    """
+    the settings given to the *on_reload_settings* event. this is the full dict of settings, as before,
+    with the settings that changed available as :attr:`changed`, a dict of ``name: (old, new)``
+    """
+    def __init__(self, payload, changed):
+        dict.__init__(self, payload)
+        self.changed = changed
 
 class Settings:
+    """
+    the settings from your UI_Config.json, and its output file.
+    every setting in the UI_Config is available as an attribute, converted to its type
+    (checkboxes are bools, numberboxes and sliders are numbers), so reading a setting is a plain attribute lookup.
+    """
     StreamlabsEventToken = None
     TwitchApiUsername = None
     def __init__(self):
         self._root = None
         self._applied = None
-        for f in os.listdir(searchpath):
-            if f == "UI_Config.json":
-                with codecs.open(os.path.join(searchpath, f), encoding="utf-8") as e:
-                    self._root = json.load(e)
-                break
-
-        if self._root is None:
+        self._types = {}
+        self._writer = None
+        schema = _load_schema(os.path.join(searchpath, "UI_Config.json"))
+        if schema is None:
             return
 
-        for f in os.listdir(searchpath):
-            if f == self._root['output_file']:
-                with codecs.open(os.path.join(searchpath, f), encoding="utf-8-sig") as e:
-                    self._applied = json.load(e, encoding="utf-8-sig")
-                break
+        _, self._root, defaults, self._types = schema
+        applied = dict(defaults)
+        output = os.path.join(searchpath, self._root['output_file'])
+        if os.path.isfile(output):
+            with codecs.open(output, encoding="utf-8-sig") as e:
+                applied.update(self._convert(json.load(e)))
 
-        if self._applied is None:
-            self._applied = {}
-            # no settings exist, use the defaults
-            for name, sets in self._root.items():
-                if name == "output_file" or sets['type']=="button": continue
-                self._applied[name] = sets['value']
+        self._applied = applied
+        self.__dict__.update(applied)
 
-        self.__dict__.update(self._applied)
-        if not hasattr(self, "StreamlabsEventToken"):
-            self.StreamlabsEventToken = None
-
-        if not hasattr(self, "TwitchApiUsername"):
-            self.TwitchApiUsername = None
+    def _convert(self, payload):
+        types = self._types
+        return dict((name, _coerce(types[name], value) if name in types else value) for name, value in payload.items())
 
     def reload(self, payload):
-        self._applied = json.loads(payload)
-        self.__dict__.update(self._applied)
+        """
+        applies new settings.
+
+        Parameters
+        -----------
+        payload: the settings, either as the json string given by the chatbot or as an already parsed dict
+
+        Returns
+        --------
+        a dict of ``name: (old, new)`` for every setting that changed
+        """
+        if not isinstance(payload, dict):
+            payload = json.loads(payload)
+
+        payload = self._convert(payload)
+        changed = {}
+        for name, value in payload.items():
+            old = getattr(self, name, _missing)
+            if old is _missing or old != value:
+                changed[name] = (None if old is _missing else old, value)
+
+        self._applied = payload
+        self.__dict__.update(payload)
+        return changed
+
+    def _current(self):
+        return dict((name, getattr(self, name)) for name in self._applied)
 
     def save(self):
-        with codecs.open(self._root['output_file'], encoding="utf-8-sig") as f:
-            json.dump(self._applied, f)
+        """
+        saves the current settings to the output file. when attached to a bot, the write is
+        handed off to :attr:`Bot.persistence`, otherwise it happens right away.
+        """
+        if self._root is None:
+            return
+
+        path = os.path.join(searchpath, self._root['output_file'])
+        if self._writer is not None:
+            self._writer.mark_dirty(path, self._current)
+        else:
+            _atomic_write(path, self._current())
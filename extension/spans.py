@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import time
+import json
+import itertools
+import threading
+from collections import deque
+
+from .clock import perf_timer as _timer
+
+__all__ = [
+    "Trace",
+    "SpanRecorder"
+]
+
+
+class Trace(object):
+    """
+    the spans recorded for a single data packet given to Execute, and everything it caused to happen.
+    each span is a ``(name, start, end)`` tuple of readings from the recorder's timer, which is only meaningful
+    relative to :attr:`start`. :attr:`wall` is the wall-clock time the trace started at, and :meth:`to_dict` uses it
+    to turn the readings into timestamps.
+    """
+    __slots__ = ("id", "kind", "start", "wall", "spans")
+
+    def __init__(self, id, kind, start, wall=None):
+        self.id = id
+        self.kind = kind
+        self.start = start
+        self.wall = time.time() if wall is None else wall
+        self.spans = []
+
+    def span(self, name, start, end):
+        self.spans.append((name, start, end))
+
+    def to_dict(self):
+        offset = self.wall - self.start
+        return {"id": self.id, "kind": self.kind, "start": self.wall,
+                "spans": [{"name": name, "start": start + offset, "end": end + offset, "duration": end - start}
+                          for name, start, end in self.spans]}
+
+    def __repr__(self):
+        return "<Trace {0} kind: {1} spans: {2}>".format(self.id, self.kind, len(self.spans))
+
+
+class SpanRecorder(object):
+    """
+    records :class:`Trace` objects into a ring buffer, available as :attr:`Bot.spans` when the bot is created with
+    ``enable_tracing=True``. only the latest *size* traces are kept.
+
+    the recorded spans are: execute, queue (the time an event waited to be dispatched), message (building the
+    :class:`Message`), checks, cooldowns, parsing (argument conversion), pre_hook, callback, post_hook,
+    parse (:meth:`Bot.parse`) and send.
+    """
+    def __init__(self, size=1024, timer=_timer):
+        self.timer = timer
+        self._traces = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self._traces)
+
+    def __iter__(self):
+        return iter(list(self._traces))
+
+    @property
+    def current(self):
+        """
+        the trace being handled on this thread, if any
+        """
+        return getattr(self._local, "trace", None)
+
+    @current.setter
+    def current(self, trace):
+        self._local.trace = trace
+
+    def new_trace(self, kind):
+        trace = Trace(next(self._ids), kind, self.timer())
+        self._traces.append(trace)
+        return trace
+
+    def clear(self):
+        self._traces.clear()
+
+    def dump(self, path):
+        """
+        writes the buffered traces to a file, one json object per line
+        """
+        with open(path, "w") as f:
+            for trace in list(self._traces):
+                f.write(json.dumps(trace.to_dict()))
+                f.write("\n")
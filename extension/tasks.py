@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""
+The MIT License (MIT)
+
+Copyright (c) 2019 IAmTomahawkx
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+import sys
+import heapq
+import itertools
+import collections
+
+from .asynchandlers import Future
+from .errors import TaskCancelled, TaskTimeout
+
+__all__ = [
+    "Task",
+    "TaskScheduler",
+    "sleep",
+    "wait_for"
+]
+
+# marks a heap entry as the timeout of a wait_for, rather than a sleep
+_TIMEOUT = object()
+
+
+class _Sleep(object):
+    __slots__ = ("seconds",)
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class _Wait(object):
+    __slots__ = ("flag", "check", "timeout")
+
+    def __init__(self, flag, check, timeout):
+        self.flag = flag
+        self.check = check
+        self.timeout = timeout
+
+
+def sleep(seconds):
+    """
+    yield this from a task to resume it after *seconds*. yielding a number does the same thing
+    """
+    return _Sleep(seconds)
+
+
+def wait_for(flag, check=None, timeout=None):
+    """
+    yield this from a task to resume it when the event *flag* (without the *on_* prefix) is next dispatched.
+    the task is resumed with the event's arguments; a single argument is passed by itself, several as a tuple.
+
+    Parameters
+    -----------
+    flag: the event to wait for, IE ``"message"``
+    check: a callable taking the event's arguments. the task is only resumed when it returns True
+    timeout: seconds to wait before :exc:`TaskTimeout` is raised inside the task
+    """
+    return _Wait("on_" + flag, check, timeout)
+
+
+class Task(Future):
+    """
+    a generator being run by the bot. create these with :meth:`Bot.create_task`, don't create them directly.
+    the generator can yield :func:`sleep` (or a number of seconds), :func:`wait_for`, a :class:`Future`
+    or another task, and is resumed on a later tick with the result.
+    tasks are futures themselves, so other tasks can wait for them to finish.
+    """
+    def __init__(self, scheduler, generator, name=None, on_error=None):
+        Future.__init__(self, scheduler._bot)
+        self._scheduler = scheduler
+        self._generator = generator
+        self._on_error = on_error
+        # bumped whenever the task is resumed, so leftover sleeps/waits from earlier yields are ignored
+        self._token = 0
+        self.name = name or getattr(generator, "__name__", "task")
+        self.cancelled = False
+        self.exception = None
+
+    def cancel(self):
+        """
+        stops the task. the generator gets a GeneratorExit, so its finally blocks still run.
+        returns False if the task had already finished
+        """
+        return self._scheduler.cancel(self)
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else "done" if self.done else "pending"
+        return "<Task {0} {1}>".format(self.name, state)
+
+
+class TaskScheduler(object):
+    """
+    runs the bot's tasks, available as :attr:`Bot.tasks`. sleeping tasks are kept in a heap and waiting tasks
+    per event, so thousands of pending tasks cost nothing until they are due.
+    """
+    def __init__(self, bot):
+        self._bot = bot
+        self._sleeping = []
+        self._counter = itertools.count()
+        # "on_<flag>" -> [(task, token, check)]. the bot checks this before notifying, so events nobody waits for
+        # are a single dict lookup
+        self.waiting = {}
+        # futures can complete on other threads, so their tasks are resumed from the next tick
+        self._ready = collections.deque()
+        self.tasks = set()
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def create(self, generator, name=None, on_error=None):
+        """
+        starts running *generator* as a task, up to its first yield, and returns the :class:`Task`
+        """
+        task = Task(self, generator, name, on_error)
+        self.tasks.add(task)
+        self._step(task)
+        return task
+
+    def _step(self, task, value=None, exception=None):
+        task._token += 1
+        stats = self._bot.parent_stats
+        if stats is not None:
+            stats.push("task:" + task.name)
+        try:
+            if exception is not None:
+                yielded = task._generator.throw(exception)
+            else:
+                yielded = task._generator.send(value)
+
+        except StopIteration as e:
+            self._finish(task, getattr(e, "value", None))
+            return
+
+        except Exception as e:
+            task.exception = e
+            self._finish(task, None)
+            tb = sys.exc_info()[2]
+            if task._on_error is not None:
+                task._on_error(e, tb)
+            else:
+                self._bot._inner_dispatch("error", e, tb)
+            return
+
+        finally:
+            if stats is not None:
+                stats.pop()
+
+        self._park(task, yielded)
+
+    def _park(self, task, yielded):
+        token = task._token
+        if yielded is None or isinstance(yielded, (int, float)):
+            yielded = _Sleep(yielded or 0)
+
+        if isinstance(yielded, _Sleep):
+            heapq.heappush(self._sleeping, (self._bot.clock.time() + yielded.seconds, next(self._counter), task,
+                                            token, None))
+
+        elif isinstance(yielded, _Wait):
+            waiters = self.waiting.get(yielded.flag)
+            if waiters is None:
+                waiters = self.waiting[yielded.flag] = []
+            waiters.append((task, token, yielded.check))
+            if yielded.timeout is not None:
+                heapq.heappush(self._sleeping, (self._bot.clock.time() + yielded.timeout, next(self._counter), task,
+                                                token, _TIMEOUT))
+
+        elif isinstance(yielded, Future):
+            yielded.add_waiter(lambda future: self._ready.append((task, token, future)))
+
+        else:
+            self._step(task, exception=TypeError(
+                "tasks can only yield sleep(), wait_for(), numbers, futures or tasks, not {0!r}".format(yielded)))
+
+    def _finish(self, task, result):
+        self.tasks.discard(task)
+        task.set_result(result)
+
+    def _resume_future(self, task, future):
+        if isinstance(future, Task):
+            if future.cancelled:
+                return self._step(task, exception=TaskCancelled())
+            if future.exception is not None:
+                return self._step(task, exception=future.exception)
+        self._step(task, future.result)
+
+    def notify(self, flag, args, waiters=None):
+        """
+        resumes the tasks waiting for the event *flag*. called by the bot for every dispatched event that has waiters,
+        with the waiters it took out of :attr:`waiting` before running the event's listeners
+        """
+        if waiters is None:
+            waiters = self.waiting.pop(flag, None)
+        if not waiters:
+            return
+
+        keep = []
+        ready = []
+        for entry in waiters:
+            task, token, check = entry
+            if task.done or token != task._token:
+                # cancelled, timed out or already resumed
+                continue
+
+            try:
+                matched = check is None or check(*args)
+            except Exception as e:
+                ready.append((task, token, e))
+                continue
+
+            if matched:
+                ready.append((task, token, None))
+            else:
+                keep.append(entry)
+
+        if keep:
+            self.waiting.setdefault(flag, []).extend(keep)
+
+        value = args[0] if len(args) == 1 else args
+        for task, token, error in ready:
+            if token == task._token and not task.done:
+                if error is not None:
+                    self._step(task, exception=error)
+                else:
+                    self._step(task, value)
+
+    def tick(self):
+        """
+        resumes every task that is due. called by the bot every tick
+        """
+        while self._ready:
+            task, token, future = self._ready.popleft()
+            if token == task._token and not task.done:
+                self._resume_future(task, future)
+
+        if not self._sleeping:
+            return
+
+        now = self._bot.clock.time()
+        sleeping = self._sleeping
+        while sleeping and sleeping[0][0] <= now:
+            _, _, task, token, marker = heapq.heappop(sleeping)
+            if token != task._token or task.done:
+                continue
+
+            if marker is _TIMEOUT:
+                self._step(task, exception=TaskTimeout())
+            else:
+                self._step(task)
+
+    def cancel(self, task):
+        if task.done:
+            return False
+
+        # invalidate any pending sleep/wait, then let the generator clean up
+        task._token += 1
+        task.cancelled = True
+        try:
+            task._generator.close()
+        except Exception as e:
+            self._bot._inner_dispatch("error", e, sys.exc_info()[2])
+        self._finish(task, None)
+        return True
+
+    def cancel_all(self):
+        for task in list(self.tasks):
+            self.cancel(task)
+        self._sleeping = []
+        self.waiting.clear()
+        self._ready.clear()